@@ -1,11 +1,26 @@
+import logging
+import os
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import random
-import time
-import textwrap  # 核心修复工具
+import numpy as np
 from datetime import datetime, timedelta
 
+from hexcore.backtest import hexagram_stats
+from hexcore.cards import CARD_CSS, asset_card_html, ben_card_html, daily_card_html, get_stats_html, transition_html, zhi_card_html
+from hexcore.casting import cast, line_frequency_check
+from hexcore.engine import LOOKBACK_DAYS, VOLATILITY_MULTIPLIER, calculate_hexagram, calculate_hexagram_batch
+from hexcore.hexagrams import HEXAGRAMS
+from hexcore.instrument import TRACER, span
+from hexcore.markov import TransitionModel
+from hexcore.providers import FrameProvider, YFinanceProvider, fetch_many
+from hexcore.screener import filter_scan, page, scan, scan_window
+from hexcore.store import LIVE_TTL, PriceStore
+from hexcore.stream import StreamSubscription, iter_bars
+from hexcore.timeframes import TIMEFRAMES, ResampleCache, history_start, timeframe_hexagram
+from hexcore.universe import default_universe
+
+logger = logging.getLogger(__name__)
+
 # --- 1. 页面配置 ---
 st.set_page_config(
     page_title="能源·周易量化",
@@ -39,44 +54,15 @@ st.markdown("""
     .trad-font { font-family: 'Noto Serif SC', serif; }
     .calligraphy { font-family: 'Ma Shan Zheng', cursive; }
     
-    /* CSS 绘制卦象 (解决手机不显示问题) */
-    .hex-container {
-        display: flex;
-        flex-direction: column-reverse; /* 从下往上画 */
-        gap: 5px;
-        width: 80px;
-        margin: 0 auto;
-    }
-    .line-yang {
-        width: 100%;
-        height: 12px;
-        background-color: #b91c1c; /* 朱砂红 */
-        border-radius: 4px;
-        box-shadow: 0 2px 4px rgba(185, 28, 28, 0.2);
-    }
-    .line-yin {
-        display: flex;
-        justify-content: space-between;
-        width: 100%;
-        height: 12px;
-    }
-    .line-yin-part {
-        width: 42%;
-        height: 100%;
-        background-color: #1f2937; /* 墨色 */
-        border-radius: 4px;
-        box-shadow: 0 2px 4px rgba(31, 41, 55, 0.2);
-    }
+    """ + CARD_CSS.replace("\n", "\n    ") + """
     
-    /* 结果卡片样式 */
-    .result-card {
-        background: white;
-        padding: 25px;
-        border-radius: 20px;
-        box-shadow: 0 10px 25px -5px rgba(0, 0, 0, 0.1);
-        border: 1px solid #e2e8f0;
-        text-align: center;
-        margin-bottom: 20px;
+    /* 起卦结果的揭晓动画 (交给浏览器，服务端不再 sleep) */
+    .cast-reveal {
+        animation: castReveal 1.2s ease-out;
+    }
+    @keyframes castReveal {
+        from { opacity: 0; transform: rotateY(90deg); }
+        to { opacity: 1; transform: rotateY(0deg); }
     }
     
     /* 隐藏 Streamlit 自带干扰元素 */
@@ -86,257 +72,366 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# --- 3. 核心数据字典 (全量) ---
-HEXAGRAMS = {
-    "1,1,1,1,1,1": {"name": "乾", "judgment": "元亨利贞。", "interp": "【大象】天行健，君子以自强不息。<br>【量化】多头强势，动能充沛，如飞龙在天。<br>【策略】顺势做多，但需警惕高位滞涨。<br>【生活】运势极佳，适合大展宏图，忌骄傲。", "outlook": "bullish"},
-    "0,0,0,0,0,0": {"name": "坤", "judgment": "元亨，利牝马之贞。", "interp": "【大象】地势坤，君子以厚德载物。<br>【量化】空头主导或底部盘整，波动率低。<br>【策略】不宜追高，适合定投或空仓观望。<br>【生活】包容忍耐，以静制动。", "outlook": "bearish"},
-    "1,0,0,0,1,0": {"name": "屯", "judgment": "元亨利贞。", "interp": "【大象】云雷屯。<br>【量化】筑底阶段，震荡剧烈，方向未明。<br>【策略】建仓需谨慎，控制仓位。<br>【生活】万事开头难，积蓄力量。", "outlook": "neutral"},
-    "0,1,0,0,0,1": {"name": "蒙", "judgment": "亨。", "interp": "【大象】山下出泉，蒙。<br>【量化】信息混沌，趋势不明，迷雾重重。<br>【策略】多看少动，等待信号。<br>【生活】局势不明朗，建议多咨询专家。", "outlook": "neutral"},
-    "1,1,1,0,1,0": {"name": "需", "judgment": "有孚，光亨。", "interp": "【大象】云上于天，需。<br>【量化】上涨趋势中的回调，需求在积蓄。<br>【策略】逢低吸纳，持仓待涨。<br>【生活】时机未到，耐心等待。", "outlook": "bullish"},
-    "0,1,0,1,1,1": {"name": "讼", "judgment": "有孚，窒惕。", "interp": "【大象】天与水违，讼。<br>【量化】多空分歧巨大，成交量放大但滞涨。<br>【策略】风险较高，建议减仓。<br>【生活】易生口角，以和为贵。", "outlook": "neutral"},
-    "0,1,0,0,0,0": {"name": "师", "judgment": "贞，丈人吉。", "interp": "【大象】地中有水，师。<br>【量化】空头排列，趋势性下跌，力量集中。<br>【策略】顺势做空，严守纪律。<br>【生活】需要严明的纪律和领导。", "outlook": "bearish"},
-    "0,0,0,0,1,0": {"name": "比", "judgment": "吉。", "interp": "【大象】地上有水，比。<br>【量化】板块轮动良好，市场情绪和谐。<br>【策略】跟随龙头，寻找补涨机会。<br>【生活】人际关系和谐，有贵人相助。", "outlook": "neutral"},
-    "1,1,1,0,1,1": {"name": "小畜", "judgment": "亨。密云不雨。", "interp": "【大象】风行天上，小畜。<br>【量化】上涨遇阻，窄幅震荡，蓄势待发。<br>【策略】高抛低吸，短期盘整。<br>【生活】积蓄力量，不可急于求成。", "outlook": "bullish"},
-    "1,1,0,1,1,1": {"name": "履", "judgment": "履虎尾。", "interp": "【大象】上天下泽，履。<br>【量化】高位震荡，风险积聚，如履薄冰。<br>【策略】设置止损，步步为营。<br>【生活】有惊无险，但须小心。", "outlook": "neutral"},
-    "1,1,1,0,0,0": {"name": "泰", "judgment": "小往大来。", "interp": "【大象】天地交，泰。<br>【量化】多头市场，量价齐升，极为顺畅。<br>【策略】积极做多，享受泡沫。<br>【生活】三阳开泰，非常吉利。", "outlook": "bullish"},
-    "0,0,0,1,1,1": {"name": "否", "judgment": "否之匪人。", "interp": "【大象】天地不交，否。<br>【量化】流动性枯竭，阴跌不止。<br>【策略】清仓离场，现金为王。<br>【生活】闭塞不通，宜退守。", "outlook": "bearish"},
-    "1,0,1,1,1,1": {"name": "同人", "judgment": "同人于野。", "interp": "【大象】天与火，同人。<br>【量化】市场共识形成，普涨行情。<br>【策略】重仓出击，跟随主流。<br>【生活】志同道合，利于团队。", "outlook": "bullish"},
-    "1,1,1,1,0,1": {"name": "大有", "judgment": "元亨。", "interp": "【大象】火在天上，大有。<br>【量化】牛市主升浪，收获颇丰。<br>【策略】持有核心资产，防止获利回吐。<br>【生活】运势昌隆，忌满招损。", "outlook": "bullish"},
-    "0,0,1,0,0,0": {"name": "谦", "judgment": "君子有终。", "interp": "【大象】地中有山，谦。<br>【量化】价值低估，底部夯实。<br>【策略】逢低布局，长线持有。<br>【生活】谦虚受益，低调行事。", "outlook": "neutral"},
-    "0,0,0,1,0,0": {"name": "豫", "judgment": "利建侯行师。", "interp": "【大象】雷出地奋，豫。<br>【量化】突破盘整，放量上行。<br>【策略】积极参与，顺势加仓。<br>【生活】安乐愉悦，利于行动。", "outlook": "neutral"},
-    "1,0,0,1,1,0": {"name": "随", "judgment": "元亨利贞。", "interp": "【大象】泽中有雷，随。<br>【量化】趋势跟随，无明显主见。<br>【策略】右侧交易，不摸顶底。<br>【生活】随遇而安，随时变通。", "outlook": "neutral"},
-    "0,1,1,0,0,1": {"name": "蛊", "judgment": "元亨。", "interp": "【大象】山下有风，蛊。<br>【量化】利空出尽，估值修复。<br>【策略】关注困境反转股。<br>【生活】整顿积弊，改革良机。", "outlook": "neutral"},
-    "1,1,0,0,0,0": {"name": "临", "judgment": "元亨利贞。", "interp": "【大象】泽上有地，临。<br>【量化】多头逼空，阳线连发。<br>【策略】果断进场，持有待涨。<br>【生活】居高临下，运势增长。", "outlook": "bullish"},
-    "0,0,0,0,1,1": {"name": "观", "judgment": "盥而不荐。", "interp": "【大象】风行地上，观。<br>【量化】高位滞涨，缩量整理。<br>【策略】多看少动，观察盘面。<br>【生活】冷静观察，静观其变。", "outlook": "neutral"},
-    "1,0,0,1,0,1": {"name": "噬嗑", "judgment": "利用狱。", "interp": "【大象】雷电，噬嗑。<br>【量化】关键阻力位，多空激烈博弈。<br>【策略】需要放量突破，否则回落。<br>【生活】遇到阻碍，需果断解决。", "outlook": "neutral"},
-    "1,0,1,0,0,1": {"name": "贲", "judgment": "小利有攸往。", "interp": "【大象】山下有火，贲。<br>【量化】题材炒作，概念火热但无支撑。<br>【策略】短线快进快出。<br>【生活】表面繁荣，需看清本质。", "outlook": "neutral"},
-    "0,0,0,0,0,1": {"name": "剥", "judgment": "不利有攸往。", "interp": "【大象】山附于地，剥。<br>【量化】高位崩塌，获利盘出逃。<br>【策略】止损离场，不可抄底。<br>【生活】基础不稳，防范损失。", "outlook": "bearish"},
-    "1,0,0,0,0,0": {"name": "复", "judgment": "亨。", "interp": "【大象】雷在地中，复。<br>【量化】超跌反弹，V型反转。<br>【策略】左侧建仓，长线布局。<br>【生活】一阳来复，否极泰来。", "outlook": "bullish"},
-    "1,0,0,1,1,1": {"name": "无妄", "judgment": "元亨利贞。", "interp": "【大象】天下雷行，物与无妄。<br>【量化】回归价值，去除泡沫。<br>【策略】不追题材，关注基本面。<br>【生活】真实无妄，不可投机。", "outlook": "neutral"},
-    "1,1,1,0,0,1": {"name": "大畜", "judgment": "利贞。", "interp": "【大象】天在山中，大畜。<br>【量化】横盘吸筹，主力建仓。<br>【策略】耐心持股，等待主升浪。<br>【生活】积蓄巨大，厚积薄发。", "outlook": "neutral"},
-    "1,0,0,0,0,1": {"name": "颐", "judgment": "贞吉。", "interp": "【大象】山下有雷，颐。<br>【量化】缩量整固，上下两难。<br>【策略】高抛低吸，或休息观望。<br>【生活】颐养身心，此时宜静。", "outlook": "neutral"},
-    "0,1,1,1,1,0": {"name": "大过", "judgment": "栋桡。", "interp": "【大象】泽灭木，大过。<br>【量化】严重超买，乖离率过大。<br>【策略】风险极大，建议清仓。<br>【生活】压力过大，需释放压力。", "outlook": "neutral"},
-    "0,1,0,0,1,0": {"name": "坎", "judgment": "习坎。", "interp": "【大象】水流而不盈，习坎。<br>【量化】破位下行，深不见底。<br>【策略】现金为王，切勿接飞刀。<br>【生活】重重险陷，务必保守。", "outlook": "bearish"},
-    "1,0,1,1,0,1": {"name": "离", "judgment": "利贞。", "interp": "【大象】明两作，离。<br>【量化】加速赶顶，情绪狂热。<br>【策略】短线博弈，快进快出。<br>【生活】如日中天，但来去匆匆。", "outlook": "bullish"},
-    "0,0,1,1,1,0": {"name": "咸", "judgment": "亨。", "interp": "【大象】山上有泽，咸。<br>【量化】消息刺激，脉冲式行情。<br>【策略】关注消息面，灵活操作。<br>【生活】感应沟通，利于社交。", "outlook": "neutral"},
-    "0,1,1,1,0,0": {"name": "恒", "judgment": "亨。", "interp": "【大象】雷风，恒。<br>【量化】趋势稳定，慢牛或阴跌。<br>【策略】顺着当前趋势操作。<br>【生活】恒久持续，保持现状。", "outlook": "neutral"},
-    "0,0,1,1,1,1": {"name": "遁", "judgment": "亨，小利贞。", "interp": "【大象】天下有山，遁。<br>【量化】诱多出货，重心下移。<br>【策略】逢反弹减仓，避险为主。<br>【生活】退避隐遁，不宜争锋。", "outlook": "bearish"},
-    "1,1,1,1,0,0": {"name": "大壮", "judgment": "利贞。", "interp": "【大象】雷在天上，大壮。<br>【量化】放量突破，强势上攻。<br>【策略】重仓持有，防冲高回落。<br>【生活】声势壮大，适合进攻。", "outlook": "bullish"},
-    "0,0,0,1,0,1": {"name": "晋", "judgment": "康侯用锡马。", "interp": "【大象】明出地上，晋。<br>【量化】稳步推升，进二退一。<br>【策略】积极进取，持股待涨。<br>【生活】旭日东升，步步高升。", "outlook": "bullish"},
-    "1,0,1,0,0,0": {"name": "明夷", "judgment": "利艰贞。", "interp": "【大象】明入地中，明夷。<br>【量化】黑天鹅事件，大幅跳水。<br>【策略】空仓避险，不要抱有幻想，韬光养晦。<br>【生活】前景黯淡，需忍耐。", "outlook": "bearish"},
-    "1,0,1,0,1,1": {"name": "家人", "judgment": "利女贞。", "interp": "【大象】风自火出，家人。<br>【量化】防御性板块走强，结构性行情。<br>【策略】关注消费、公用事业。<br>【生活】相亲相爱，基础稳固。", "outlook": "neutral"},
-    "1,1,0,1,0,1": {"name": "睽", "judgment": "小事吉。", "interp": "【大象】上火下泽，睽。<br>【量化】板块分化，赚钱效应差。<br>【策略】多空分歧大，小仓位试错，不宜重仓。<br>【生活】意见不合，小事可为。", "outlook": "neutral"},
-    "0,0,1,0,1,0": {"name": "蹇", "judgment": "利西南。", "interp": "【大象】山上有水，蹇。<br>【量化】上有压力下有支撑，僵持不下。<br>【策略】不宜硬闯，等待变盘。<br>【生活】前有险阻，最好求援。", "outlook": "bearish"},
-    "0,1,0,1,0,0": {"name": "解", "judgment": "利西南。", "interp": "【大象】雷雨作，解。<br>【量化】利空消化，止跌回升。<br>【策略】布局超跌反弹。<br>【生活】冰消瓦解，困难消除。", "outlook": "bullish"},
-    "1,1,0,0,0,1": {"name": "损", "judgment": "有孚，元吉。", "interp": "【大象】山下有泽，损。<br>【量化】缩量阴跌，市值缩水。<br>【策略】止损换股，先失后得。<br>【生活】减损获益，需投入成本。", "outlook": "bearish"},
-    "1,0,0,0,1,1": {"name": "益", "judgment": "利有攸往。", "interp": "【大象】风雷，益。<br>【量化】政策利好，资金流入。<br>【策略】积极参与，大展拳脚。<br>【生活】损上益下，环境宽松。", "outlook": "bullish"},
-    "1,1,1,1,1,0": {"name": "夬", "judgment": "扬于王庭。", "interp": "【大象】泽上于天，夬。<br>【量化】冲关时刻，多头总攻。<br>【策略】必须果断跟进，切勿犹豫。<br>【生活】决断突破，必须果断。", "outlook": "bullish"},
-    "0,1,1,1,1,1": {"name": "姤", "judgment": "女壮，勿用取女。", "interp": "【大象】天下有风，姤。<br>【量化】冲高回落，头部迹象。<br>【策略】虽然上涨但需减仓。<br>【生活】不期而遇，防微杜渐。", "outlook": "bearish"},
-    "0,0,0,0,1,1": {"name": "萃", "judgment": "亨。", "interp": "【大象】泽上于地，萃。<br>【量化】资金抱团，龙头效应。<br>【策略】加入核心资产，享受泡沫。<br>【生活】聚集荟萃，人气高涨。", "outlook": "bullish"},
-    "0,1,1,0,0,0": {"name": "升", "judgment": "元亨。", "interp": "【大象】地中生木，升。<br>【量化】稳步上涨，均线多头。<br>【策略】坚定持仓，不轻易下车。<br>【生活】积小成大，步步高升。", "outlook": "bullish"},
-    "0,1,0,1,1,0": {"name": "困", "judgment": "亨，贞，大人吉。", "interp": "【大象】泽无水，困。<br>【量化】成交低迷，无人问津。<br>【策略】不要轻易抄底，效率极低。<br>【生活】困顿穷乏，需坚守。", "outlook": "neutral"},
-    "0,1,1,0,1,0": {"name": "井", "judgment": "改邑不改井。", "interp": "【大象】木上有水，井。<br>【量化】织布机行情，原地踏步。<br>【策略】适合高股息策略，做定投。<br>【生活】价值仍在，适合定投。", "outlook": "neutral"},
-    "1,0,1,1,1,0": {"name": "革", "judgment": "元亨利贞。", "interp": "【大象】泽中有火，革。<br>【量化】风格切换，新老交替。<br>【策略】调仓换股，跟随新热点。<br>【生活】除旧布新，面临变革。", "outlook": "neutral"},
-    "0,1,1,1,0,1": {"name": "鼎", "judgment": "元吉。", "interp": "【大象】木上有火，鼎。<br>【量化】新周期确立，权重搭台，格局稳定。<br>【策略】布局蓝筹，长线看好。<br>【生活】稳重图新，新的繁荣。", "outlook": "bullish"},
-    "1,0,0,1,0,0": {"name": "震", "judgment": "亨。", "interp": "【大象】洊雷，震。<br>【量化】消息面利空，盘中急跌。<br>【策略】或是黄金坑，注意情绪修复。<br>【生活】突发事件，有惊无险。", "outlook": "neutral"},
-    "0,0,1,0,0,1": {"name": "艮", "judgment": "艮其背。", "interp": "【大象】兼山，艮。<br>【量化】上涨乏力，多重顶。<br>【策略】止盈离场，休息观望。<br>【生活】动静适时，止步不前。", "outlook": "neutral"},
-    "0,0,1,0,1,1": {"name": "渐", "judgment": "女归吉。", "interp": "【大象】山上有木，渐。<br>【量化】碎步上行，慢牛行情。<br>【策略】保持耐心，不要被震荡洗出局。<br>【生活】循序渐进，终成大器。", "outlook": "neutral"},
-    "1,1,0,1,0,0": {"name": "归妹", "judgment": "征凶。", "interp": "【大象】泽上有雷，归妹。<br>【量化】走势怪异，诱多陷阱。<br>【策略】如果不看好，坚决不参与。<br>【生活】错位之象，易失误。", "outlook": "neutral"},
-    "1,0,1,1,0,0": {"name": "丰", "judgment": "亨。", "interp": "【大象】雷电皆至，丰。<br>【量化】成交天量，情绪亢奋。<br>【策略】逐步止盈，落袋为安。<br>【生活】达到顶峰，盛极必衰。", "outlook": "bullish"},
-    "0,0,1,1,1,0": {"name": "旅", "judgment": "小亨。", "interp": "【大象】山上有火，旅。<br>【量化】游资主导，一日游行情。<br>【策略】打板或超短线，快进快出。<br>【生活】漂泊不定，不宜久留。", "outlook": "neutral"},
-    "0,1,1,0,1,1": {"name": "巽", "judgment": "小亨。", "interp": "【大象】随风，巽。<br>【量化】市场形成一致预期，无脑跟随。<br>【策略】不要逆势操作，风往哪吹往哪倒。<br>【生活】顺风而行，顺从时势。", "outlook": "neutral"},
-    "1,1,0,1,1,0": {"name": "兑", "judgment": "亨。", "interp": "【大象】丽泽，兑。<br>【量化】交易活跃，换手率高。<br>【策略】积极参与热点，但防高位被套。<br>【生活】喜悦沟通，防口舌是非。", "outlook": "bullish"},
-    "0,1,0,0,1,1": {"name": "涣", "judgment": "亨。", "interp": "【大象】风行水上，涣。<br>【量化】筹码松动，主力撤退，行情散去。<br>【策略】该跑就跑，不要留恋。<br>【生活】离散之象，人心涣散，凝聚力瓦解。", "outlook": "neutral"},
-    "1,1,0,0,1,0": {"name": "节", "judgment": "亨。", "interp": "【大象】泽上有水，节。<br>【量化】箱体震荡，上有顶下有底。<br>【策略】高抛低吸，懂得止盈。<br>【生活】节制适度，量力而行。", "outlook": "neutral"},
-    "1,1,0,0,1,1": {"name": "中孚", "judgment": "豚鱼吉。", "interp": "【大象】泽上有风，中孚。<br>【量化】技术指标有效，走势规范。<br>【策略】按技术图形操作，相信信号。<br>【生活】诚信感通，脚下有路。", "outlook": "neutral"},
-    "0,0,1,1,0,0": {"name": "小过", "judgment": "亨，利贞。", "interp": "【大象】山上有雷，小过。<br>【量化】小幅波动，大趋势不明。<br>【策略】小仓位试错，不要重仓博弈。<br>【生活】小有过度，宜守。", "outlook": "neutral"},
-    "1,0,1,0,1,0": {"name": "既济", "judgment": "亨，小利贞。", "interp": "【大象】水在火上，既济。<br>【量化】完美收官，利好兑现。<br>【策略】获利了结，见好就收。<br>【生活】大功告成，防盛极而衰。", "outlook": "neutral"},
-    "0,1,0,1,0,1": {"name": "未济", "judgment": "亨。", "interp": "【大象】火在水上，未济。<br>【量化】行情未完，充满变数。<br>【策略】寻找新的增长点，在此博弈。<br>【生活】未完成，充满希望。", "outlook": "neutral"}
-}
+# --- 4. 调试计时 (HEX_TRACE=1 / HEX_TRACE_FILE / HEX_METRICS_PORT 开启，默认关闭) ---
+@st.cache_resource
+def start_metrics_server(port):
+    return TRACER.serve(port)
 
-# --- 4. 辅助函数: 生成卦象HTML (压扁成单行，去缩进) ---
-def get_hexagram_html(key_str):
-    lines = key_str.split(",") 
-    html_lines = []
-    # 视觉显示 Top->Bottom (上->初)，所以需要 reversed
-    for val in reversed(lines):
-        if val == "1":
-            html_lines.append('<div class="line-yang"></div>')
-        else:
-            html_lines.append('<div class="line-yin"><div class="line-yin-part"></div><div class="line-yin-part"></div></div>')
-    
-    return f'<div class="hex-container">{"".join(html_lines)}</div>'
-
-# --- 5. 计算逻辑 ---
-def calculate_hexagram(df):
-    try:
-        closes = df['Close'].values.flatten()
-        opens = df['Open'].values.flatten()
-    except:
-        closes = df['Close']
-        opens = df['Open']
-    
-    changes = abs((closes - opens) / opens)
-    avg_change = changes.mean() 
-    volatility_threshold = avg_change * 1.5
-    
-    ben_lines = [] 
-    zhi_lines = [] 
-    details = []
-
-    # 取最后6天，倒序遍历 (i=0是最新)
-    # 逻辑：df.tail(6) 是 [Oldest...Newest]
-    # 反转后 subset 是 [Newest...Oldest]
-    subset = df.tail(6).iloc[::-1] 
-    
-    for i in range(6):
-        row = subset.iloc[i]
-        
-        c = float(row['Close'])
-        o = float(row['Open'])
-        
-        is_up = c >= o
-        change_pct = abs((c - o) / o)
-        
-        is_moving = change_pct > volatility_threshold
-        
-        if is_up:
-            line_val = 9 if is_moving else 7
+if os.environ.get("HEX_METRICS_PORT"):
+    start_metrics_server(int(os.environ["HEX_METRICS_PORT"]))
+
+# spans 由各标签页片段开头的 TRACER.collect() 取得，只含该片段本次运行的阶段
+def render_debug_panel(spans):
+    if not TRACER.enabled:
+        return
+    with st.expander("🛠 调试面板 (Debug · 阶段耗时)"):
+        if spans:
+            st.dataframe(pd.DataFrame([{
+                "Stage": "　" * s["depth"] + s["name"],
+                "ms": round(s["duration_ms"], 3),
+                "Symbol": s.get("symbol", ""),
+                "Error": s.get("error", "")
+            } for s in sorted(spans, key=lambda s: s["ts"])]), use_container_width=True)
         else:
-            line_val = 6 if is_moving else 8
-            
-        ben_val = 1 if line_val in [7, 9] else 0
-        zhi_val = 0 if line_val == 9 else (1 if line_val == 6 else ben_val)
-        
-        ben_lines.append(str(ben_val))
-        zhi_lines.append(str(zhi_val))
-        
-        details.append({
-            "date": row.name.strftime('%Y-%m-%d'),
-            "close": c,
-            "change": (c - o) / o,
-            "type": line_val,
-            "position": i 
-        })
-        
-    return ",".join(ben_lines), ",".join(zhi_lines), details
+            st.caption("本次运行没有记录到阶段耗时")
+        st.caption("累计计数: " + ", ".join(f"{k}={v}" for k, v in sorted(TRACER.counters.items())))
 
-# --- 6. 界面布局 ---
+# --- 5. 计算逻辑: 全部在 hexcore 中，本文件只做界面 (脚本任务用 python -m hexcore) ---
 
-# TABS
-tab_market, tab_daily = st.tabs(["📈 市场量化 (Tech)", "🎲 趣味问卜 (国潮)"])
+# --- 6. 行情仓库 (本地缓存，HEX_OFFLINE=1 时只读本地不联网) ---
+# HEX_PROVIDER_DIR 指向一个 <symbol>.csv 目录时，用本地替身数据源代替 yfinance
+@st.cache_resource
+def get_price_store():
+    provider = None
+    if os.environ.get("HEX_PROVIDER_DIR"):
+        provider = FrameProvider.from_dir(os.environ["HEX_PROVIDER_DIR"])
+    return PriceStore(provider=provider, offline=os.environ.get("HEX_OFFLINE") == "1")
 
-# --- MARKET TAB ---
-with tab_market:
+# 分时仓库与日线分开存放；HEX_INTRADAY_DIR 指向 <symbol>.csv 分钟/小时线目录时用作本地数据源
+@st.cache_resource
+def get_intraday_store():
+    if os.environ.get("HEX_INTRADAY_DIR"):
+        provider = FrameProvider.from_dir(os.environ["HEX_INTRADAY_DIR"])
+    else:
+        provider = YFinanceProvider(interval="1h")
+    daily = get_price_store()
+    return PriceStore(os.path.join(daily.root, "intraday"), provider=provider, offline=daily.offline)
+
+# 模型参数 (取数窗口天数, 动爻阈值倍数)，随结果缓存的键一起传给各步计算
+MODEL_PARAMS = (LOOKBACK_DAYS, VOLATILITY_MULTIPLIER)
+
+# 回测统计: 只用基准日期之前的数据，避免未来函数
+BACKTEST_START = "2000-01-01"
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_backtest_stats(symbol, end_date, params):
+    lookback_days, multiplier = params
+    df = get_price_store().get(symbol, BACKTEST_START, end_date)
+    if len(df) == 0:
+        return None
+    return hexagram_stats({symbol: df}, lookback_days=lookback_days, multiplier=multiplier)
+
+# 卦象转移模型: 随每次运行增量更新并落盘，重启后无需重建
+# 只统计本卦序列，与动爻阈值无关；lookback_days 只决定序列从哪根 K 线开始有效
+@st.cache_resource
+def get_transition_model():
+    return TransitionModel.load(os.path.join(get_price_store().root, "markov.npz"))
+
+def update_transition_model(symbol, lookback_days):
+    # 只计入今天之前已收盘的 K 线: 当日 K 线仍在变动，一旦计入，收盘后不会再重算
+    model = get_transition_model()
+    today = pd.Timestamp(datetime.now().date())
+    history = get_price_store().get(symbol, BACKTEST_START, today)
+    if model.update_from_frame(symbol, history, lookback_days):
+        model.save(os.path.join(get_price_store().root, "markov.npz"))
+    return model
+
+def get_transition_model_as_of(symbol, end_date, lookback_days):
+    # 转移分布只用基准日 (含) 之前的转移，避免未来函数:
+    # 共享模型已计入更晚的 K 线时，用截至基准日的数据临时建一个模型
+    model = update_transition_model(symbol, lookback_days)
+    end = end_date + timedelta(days=1)
+    last = model.last_time(symbol)
+    if last is None or last < np.datetime64(end, 'ns'):
+        return model
+    as_of = TransitionModel(model.horizons)
+    as_of.update_from_frame(symbol, get_price_store().get(symbol, BACKTEST_START, end), lookback_days)
+    return as_of
+
+# 多周期卦象: 周/月线由日线重采样，小时线由分时线重采样；重采样结果跨重跑缓存，只增量更新
+# 各周期的窗口固定为 40 个周期 (见 TIMEFRAMES)，只有动爻阈值倍数随模型参数变化
+@st.cache_resource
+def get_resample_cache():
+    return ResampleCache()
+
+def get_timeframe_results(symbol, end_date, multiplier):
+    daily = get_price_store().get(symbol, BACKTEST_START, end_date + timedelta(days=1))
+    results = {}
+    for tf, spec in TIMEFRAMES.items():
+        base = daily
+        if spec["base"] == "intraday":
+            # 分时数据源出错时小时线显示数据不足，其余周期照常；错误记入日志，并在调试面板的 span 上标出
+            try:
+                with span("timeframe.intraday_fetch", symbol=symbol):
+                    base = get_intraday_store().get(symbol, history_start(tf, end_date), end_date + timedelta(days=1))
+            except Exception as e:
+                logger.warning("Intraday data unavailable for %s: %s", symbol, e)
+                base = None
+        results[tf] = timeframe_hexagram(get_resample_cache(), (symbol, spec["base"]), base, tf, end_date, multiplier)
+    return results
+
+# --- 实时/回放模式: 后台线程喂入流式引擎，片段 (fragment) 定时刷新，不重跑整页 ---
+# HEX_REPLAY_DIR 下有 <symbol>.csv 时回放该文件 (如分钟线)，否则回放近一年日线
+# 每个会话最多一个回放线程；关掉回放即停止，会话关闭后线程因无人读取而超时退出
+REPLAY_DELAY = 0.2
+
+def stop_stream_subscription():
+    sub = st.session_state.pop("stream_sub", None)
+    st.session_state.pop("stream_key", None)
+    if sub is not None:
+        sub.stop()
+
+def get_stream_subscription(symbol, end_date):
+    key = ("stream", symbol, str(end_date))
+    sub = st.session_state.get("stream_sub")
+    if sub is not None and st.session_state.get("stream_key") == key:
+        return sub
+    stop_stream_subscription()
+    replay_file = os.path.join(os.environ.get("HEX_REPLAY_DIR", ""), f"{symbol}.csv")
+    if os.environ.get("HEX_REPLAY_DIR") and os.path.exists(replay_file):
+        source = replay_file
+    else:
+        source = get_price_store().get(symbol, end_date - timedelta(days=365), end_date + timedelta(days=1))
+    sub = StreamSubscription(iter_bars(source, delay=REPLAY_DELAY))
+    st.session_state["stream_sub"], st.session_state["stream_key"] = sub, key
+    return sub
+
+@st.fragment(run_every=1)
+def render_live_panel(symbol, end_date):
+    sub = get_stream_subscription(symbol, end_date)
+    sub.touch()
+    event = sub.latest
+    status = "回放结束" if sub.done else "接收中"
+    st.caption(f"📡 {status} · 已处理 {sub.stream.bars} 根 K 线 · 卦象变化 {len(sub.events)} 次")
+    if event is None:
+        st.info("等待足够的 K 线 (至少6根)...")
+        return
+    st.caption(f"最新变化: {pd.Timestamp(event['time']).strftime('%Y-%m-%d %H:%M')}")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown(ben_card_html(event["ben"]), unsafe_allow_html=True)
+    with c2:
+        st.markdown(zhi_card_html(event["ben"], event["zhi"]), unsafe_allow_html=True)
+
+# 全市场筛选: 品种池 (HEX_UNIVERSE_FILE 可自定义)，结果表的展示列名
+@st.cache_resource
+def get_universe():
+    return default_universe()
+
+SCAN_PAGE_SIZE = 50
+SCAN_COLUMNS = {
+    "symbol": "Symbol",
+    "sector": "板块",
+    "date": "Date",
+    "close": "Close",
+    "change": "Chg%",
+    "ben_name": "本卦",
+    "zhi_name": "之卦",
+    "moving_count": "动爻数",
+    "moving_lines": "动爻",
+    "outlook": "Outlook",
+}
+SCAN_SORTS = {"moving_count": "动爻数", "ben": "本卦", "change": "Chg%", "close": "Close", "symbol": "Symbol", "sector": "板块"}
+
+ASSETS = {
+    "BZ=F": "🛢️ Brent Crude",
+    "NG=F": "🔥 Natural Gas",
+    "TTF=F": "🇪🇺 Dutch TTF",
+    "RB=F": "⛽ RBOB Gasoline"
+}
+
+# --- 结果缓存: 按 (品种, 日期, 模型参数) 缓存卦象明细与卡片 HTML ---
+# st.cache_data 以 LRU + TTL 淘汰 (max_entries / ttl)，所有会话共享；TTL 与当日行情的重拉间隔一致
+RESULT_ENTRIES = 512
+POS_MAP = ["初爻 (Bottom)", "二爻", "三爻", "四爻", "五爻", "上爻 (Top)"]
+TYPE_MAP = {7: "阳 (7)", 8: "阴 (8)", 9: "老阳 (9) 🔴", 6: "老阴 (6) 🔵"}
+
+@st.cache_data(ttl=LIVE_TTL, max_entries=RESULT_ENTRIES, show_spinner=False)
+def get_single_view(symbol, end_date, params):
+    lookback_days, multiplier = params
+    df = get_price_store().get(symbol, end_date - timedelta(days=lookback_days), end_date + timedelta(days=1))
+    if len(df) < 6:
+        return None
+    ben_code, zhi_code, line_details = calculate_hexagram(df, multiplier)
+    stats = get_backtest_stats(symbol, end_date + timedelta(days=1), params)
+    with span("markov.update", symbol=symbol):
+        model = get_transition_model_as_of(symbol, end_date, lookback_days)
+
+    timeframes = []
+    for tf, (result, last_bar) in get_timeframe_results(symbol, end_date, multiplier).items():
+        label = TIMEFRAMES[tf]["label"]
+        if last_bar is not None:
+            label += f" · {last_bar.strftime('%Y-%m-%d %H:%M' if tf == '1h' else '%Y-%m-%d')}"
+        timeframes.append(asset_card_html(label, result))
+
+    with span("render.cards", symbol=symbol):
+        return {
+            "ben_html": ben_card_html(ben_code, get_stats_html(stats, ben_code)),
+            "zhi_html": zhi_card_html(ben_code, zhi_code),
+            "transition_html": transition_html({
+                "次日": model.distribution(ben_code, 1, symbol),
+                "下周": model.distribution(ben_code, 5, symbol)
+            }),
+            "timeframes": timeframes,
+            "table": [{
+                "Date": d['date'],
+                "Pos": POS_MAP[d['position']],
+                "Close": f"{d['close']:.2f}",
+                "Chg%": f"{d['change']*100:.2f}%",
+                "Type": TYPE_MAP[d['type']]
+            } for d in line_details],
+        }
+
+@st.cache_data(ttl=LIVE_TTL, max_entries=RESULT_ENTRIES, show_spinner=False)
+def get_grid_view(end_date, params):
+    # 并发取数 + 批量计算，每个品种一张紧凑卡片
+    # 回测统计要用全历史: 先并发补齐各品种自 BACKTEST_START 起的数据，之后逐个统计只读本地
+    lookback_days, multiplier = params
+    get_price_store().sync_many(ASSETS, BACKTEST_START, end_date + timedelta(days=1))
+    frames = fetch_many(get_price_store(), ASSETS, end_date - timedelta(days=lookback_days), end_date + timedelta(days=1))
+    results = calculate_hexagram_batch(frames, multiplier)
+    cards = []
+    for asset in ASSETS:
+        stats = get_backtest_stats(asset, end_date + timedelta(days=1), params)
+        with span("render.cards", symbol=asset):
+            cards.append(asset_card_html(ASSETS[asset], results[asset], stats))
+    return cards
+
+# --- 7. 界面布局 ---
+# 每个标签页是一个独立的片段 (fragment): 页内交互只重跑该页，不重跑整页、不重新注入 CSS；
+# 按钮触发的结果存进 session_state，之后的重跑直接从结果缓存渲染
+
+@st.fragment
+def render_market_tab():
+    spans = TRACER.collect()
     st.markdown('<div class="tech-font">', unsafe_allow_html=True)
     
     col1, col2 = st.columns([1, 1])
     with col1:
         symbol = st.selectbox("选择品种 (Asset)", 
-                     ["BZ=F", "NG=F", "TTF=F", "RB=F"], 
-                     format_func=lambda x: {
-                         "BZ=F": "🛢️ Brent Crude", 
-                         "NG=F": "🔥 Natural Gas",
-                         "TTF=F": "🇪🇺 Dutch TTF", 
-                         "RB=F": "⛽ RBOB Gasoline"
-                     }[x])
+                     list(ASSETS), 
+                     format_func=lambda x: ASSETS[x])
+        all_assets = st.checkbox("全部品种对比 (All assets)")
+        live_mode = st.checkbox("📡 实时回放 (Live replay)")
     with col2:
         date_val = st.date_input("基准日期 (Date)", datetime.now())
         
+    run_key = (symbol, all_assets, pd.to_datetime(date_val))
     if st.button("🚀 启动量化模型 (RUN MODEL)", type="primary"):
+        st.session_state["market_run"] = run_key
+    # 品种 / 模式 / 日期改了就不再显示上一次的结果，避免旧卦象被当成当前输入的结果
+    if st.session_state.get("market_run", run_key) != run_key:
+        del st.session_state["market_run"]
+
+    if "market_run" in st.session_state:
+        run_symbol, run_all, end_date = st.session_state["market_run"]
         with st.spinner("Connecting to Exchange..."):
             try:
-                end_date = pd.to_datetime(date_val)
-                start_date = end_date - timedelta(days=40)
-                
-                df = yf.download(symbol, start=start_date, end=end_date + timedelta(days=1), progress=False)
-                
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = df.columns.get_level_values(0)
-
-                if len(df) < 6:
-                    st.error("数据不足，无法生成卦象 (需至少6个交易日)")
+                if run_all:
+                    cards = get_grid_view(end_date, MODEL_PARAMS)
+                    st.markdown("---")
+                    for col, card in zip(st.columns(len(cards)), cards):
+                        with col:
+                            st.markdown(card, unsafe_allow_html=True)
                 else:
-                    ben_key, zhi_key, line_details = calculate_hexagram(df)
-                    
-                    ben_info = HEXAGRAMS.get(ben_key)
-                    zhi_info = HEXAGRAMS.get(zhi_key)
-                    
-                    if not ben_info:
-                        st.error(f"System Error: Invalid Hexagram Key {ben_key}")
+                    view = get_single_view(run_symbol, end_date, MODEL_PARAMS)
+                    if view is None:
+                        st.error("数据不足，无法生成卦象 (需至少6个交易日)")
                     else:
                         st.markdown("---")
                         
                         c1, c2 = st.columns(2)
                         
-                        # 1. 本卦卡片 (修复缩进问题)
+                        # 1. 本卦卡片
                         with c1:
-                            hex_html = get_hexagram_html(ben_key)
-                            # 预处理解释文本，去除潜在的换行符
-                            interp_clean = ben_info['interp'].replace('\n', '')
+                            st.markdown(view["ben_html"], unsafe_allow_html=True)
                             
-                            html_str = textwrap.dedent(f"""
-                                <div class="result-card">
-                                    <div style="color:#64748b; font-weight:bold; font-size:12px; margin-bottom:5px;">CURRENT PHASE (本卦)</div>
-                                    {hex_html}
-                                    <div style="font-size:24px; font-weight:bold; margin-top:10px;">{ben_info['name']}</div>
-                                    <div style="font-size:14px; font-style:italic; color:#64748b;">{ben_info['judgment']}</div>
-                                    <hr style="margin:10px 0; border-top: 1px solid #e2e8f0;">
-                                    <div style="text-align:left; font-size:13px; line-height:1.6;">
-                                        {interp_clean}
-                                    </div>
-                                </div>
-                            """).strip()
-                            st.markdown(html_str, unsafe_allow_html=True)
-                            
-                        # 2. 之卦卡片 (修复缩进问题)
+                        # 2. 之卦卡片 + 转移概率
                         with c2:
-                            hex_html_zhi = get_hexagram_html(zhi_key)
-                            opacity = "1" if ben_key != zhi_key else "0.5"
-                            suffix = "(变卦)" if ben_key != zhi_key else "(无变动)"
-                            interp_clean_zhi = zhi_info['interp'].replace('\n', '')
-                            
-                            html_str_zhi = textwrap.dedent(f"""
-                                <div class="result-card" style="opacity:{opacity};">
-                                    <div style="color:#64748b; font-weight:bold; font-size:12px; margin-bottom:5px;">PROJECTION (之卦)</div>
-                                    {hex_html_zhi}
-                                    <div style="font-size:24px; font-weight:bold; margin-top:10px;">{zhi_info['name']} {suffix}</div>
-                                    <div style="font-size:14px; font-style:italic; color:#64748b;">{zhi_info['judgment']}</div>
-                                    <hr style="margin:10px 0; border-top: 1px solid #e2e8f0;">
-                                    <div style="text-align:left; font-size:13px; line-height:1.6;">
-                                        {interp_clean_zhi}
-                                    </div>
-                                </div>
-                            """).strip()
-                            st.markdown(html_str_zhi, unsafe_allow_html=True)
+                            st.markdown(view["zhi_html"], unsafe_allow_html=True)
+                            st.markdown(view["transition_html"], unsafe_allow_html=True)
+
+                        st.subheader("🕰️ 多周期 (Timeframes)")
+                        for col, card in zip(st.columns(len(view["timeframes"])), view["timeframes"]):
+                            with col:
+                                st.markdown(card, unsafe_allow_html=True)
 
                         st.subheader("📊 K-Line Sequence")
-                        
-                        table_data = []
-                        pos_map = ["初爻 (Bottom)", "二爻", "三爻", "四爻", "五爻", "上爻 (Top)"]
-                        
-                        for d in line_details:
-                            type_str = "阳 (7)"
-                            if d['type'] == 8: type_str = "阴 (8)"
-                            if d['type'] == 9: type_str = "老阳 (9) 🔴"
-                            if d['type'] == 6: type_str = "老阴 (6) 🔵"
-                            
-                            table_data.append({
-                                "Date": d['date'],
-                                "Pos": pos_map[d['position']],
-                                "Close": f"{d['close']:.2f}",
-                                "Chg%": f"{d['change']*100:.2f}%",
-                                "Type": type_str
-                            })
-                        
-                        st.dataframe(pd.DataFrame(table_data), use_container_width=True)
+                        with span("render.table", symbol=run_symbol):
+                            st.dataframe(pd.DataFrame(view["table"]), use_container_width=True)
 
             except Exception as e:
                 st.error(f"Data Error: {e}")
+
+    if live_mode:
+        st.markdown("---")
+        render_live_panel(symbol, pd.to_datetime(date_val))
+    else:
+        stop_stream_subscription()
+    render_debug_panel(spans)
     st.markdown('</div>', unsafe_allow_html=True)
 
-# --- DAILY TAB ---
-with tab_daily:
+@st.fragment
+def render_screener_tab():
+    spans = TRACER.collect()
+    st.markdown('<div class="tech-font">', unsafe_allow_html=True)
+    universe = get_universe()
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        sectors = st.multiselect("板块 (Sectors)", list(dict.fromkeys(universe.values())), placeholder="全部板块")
+        scan_date = st.date_input("基准日期 (Date)", datetime.now(), key="scan_date")
+    with col2:
+        ben_names = st.multiselect("本卦 (Hexagram)", [info["name"] for info in HEXAGRAMS.values()], placeholder="全部卦象")
+        min_moving = st.slider("最少动爻数 (Min moving lines)", 0, 6, 0)
+
+    if st.button("🔭 扫描全市场 (SCAN)", type="primary"):
+        with st.spinner(f"Scanning {len(universe)} assets..."):
+            try:
+                pool = {s: sector for s, sector in universe.items() if not sectors or sector in sectors}
+                start_date, end_date = scan_window(scan_date)
+                get_price_store().sync_many(pool, start_date, end_date)
+                st.session_state["scan_table"] = scan(get_price_store(), pool, scan_date)
+            except Exception as e:
+                st.error(f"Data Error: {e}")
+
+    # 扫描结果留在 session_state，筛选 / 排序 / 翻页都不重新扫描
+    scan_table = st.session_state.get("scan_table")
+    if scan_table is not None:
+        shown = filter_scan(scan_table, ben_names, min_moving, sectors=sectors)
+        s1, s2, s3 = st.columns(3)
+        with s1:
+            sort_by = st.selectbox("排序 (Sort by)", list(SCAN_SORTS), format_func=lambda x: SCAN_SORTS[x])
+        with s2:
+            descending = st.checkbox("降序 (Descending)", value=True)
+        with s3:
+            page_no = st.number_input("页码 (Page)", min_value=1, value=1, step=1)
+        rows, pages = page(shown, int(page_no), SCAN_PAGE_SIZE, sort_by, not descending)
+        st.caption(f"{len(shown)} / {len(scan_table)} 个品种符合条件 · 第 {min(int(page_no), pages)} / {pages} 页")
+        with span("render.table", rows=len(rows)):
+            display = rows[list(SCAN_COLUMNS)].assign(
+                date=rows["date"].dt.strftime('%Y-%m-%d'),
+                close=rows["close"].map(lambda x: f"{x:.2f}"),
+                change=rows["change"].map(lambda x: f"{x*100:.2f}%"),
+            ).rename(columns=SCAN_COLUMNS)
+            st.dataframe(display, use_container_width=True, hide_index=True)
+
+    render_debug_panel(spans)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+def render_daily_tab():
+    spans = TRACER.collect()
     st.markdown('<div class="trad-font">', unsafe_allow_html=True)
     
     st.markdown("""
@@ -352,70 +447,42 @@ with tab_daily:
         if not question:
             st.warning("请先输入问题")
         else:
-            with st.spinner("正在以此诚心，沟通天地..."):
-                time.sleep(1.5)
-                
-                lines = []
-                for _ in range(6):
-                    c1 = 3 if random.random() > 0.5 else 2
-                    c2 = 3 if random.random() > 0.5 else 2
-                    c3 = 3 if random.random() > 0.5 else 2
-                    lines.append(c1 + c2 + c3)
-                
-                ben_res = []
-                zhi_res = []
-                for val in lines:
-                    if val in [7, 9]: 
-                        ben_res.append("1")
-                        zhi_res.append("0" if val == 9 else "1")
-                    else: 
-                        ben_res.append("0")
-                        zhi_res.append("1" if val == 6 else "0")
-                
-                d_ben_key = ",".join(ben_res)
-                d_zhi_key = ",".join(zhi_res)
-                
-                d_ben = HEXAGRAMS[d_ben_key]
-                d_zhi = HEXAGRAMS[d_zhi_key]
-                
-                ben_html = get_hexagram_html(d_ben_key)
-                zhi_html = get_hexagram_html(d_zhi_key)
-                
-                # Daily Result Card (修复缩进问题)
-                daily_interp_clean = d_ben['interp'].replace('\n', '')
-                
-                daily_html = textwrap.dedent(f"""
-                <div class="result-card" style="background-color:#fffbf0; border:2px solid #b91c1c; padding:20px;">
-                    <div style="text-align:center; margin-bottom:20px; color:#b91c1c; font-weight:bold; font-size:18px;">问：{question}</div>
-                    
-                    <div style="display:flex; justify-content:space-around; align-items:flex-start;">
-                        <div style="text-align:center; flex:1;">
-                            <div style="font-size:12px; color:#888; margin-bottom:8px;">本卦 (现状)</div>
-                            {ben_html}
-                            <div class="calligraphy" style="font-size:32px; margin-top:8px; color:#333;">{d_ben['name']}</div>
-                            <div style="font-size:13px; color:#666;">{d_ben['judgment']}</div>
-                        </div>
-                        
-                        <div style="text-align:center; flex:1; opacity: {1.0 if d_ben_key != d_zhi_key else 0.3};">
-                            <div style="font-size:12px; color:#888; margin-bottom:8px;">之卦 (变数)</div>
-                            {zhi_html}
-                            <div class="calligraphy" style="font-size:32px; margin-top:8px; color:#333;">{d_zhi['name']}</div>
-                            <div style="font-size:13px; color:#666;">{d_zhi['judgment']}</div>
-                        </div>
-                    </div>
-                    
-                    <hr style="border-color:#e5e7eb; margin:20px 0;">
-                    
-                    <div style="background:rgba(255,255,255,0.6); padding:15px; border-radius:8px; border:1px dashed #d1d5db;">
-                        <p style="font-weight:bold; color:#b91c1c; margin-bottom:5px;">💡 锦囊妙计：</p>
-                        <div style="line-height:1.6; font-size:14px; color:#333;">
-                            {daily_interp_clean}
-                        </div>
-                        {f'<div style="margin-top:10px; font-size:13px; color:#d97706;">⚡ <strong>变爻启示：</strong>局势正在向 {d_zhi["name"]} 转变，请参考之卦建议。</div>' if d_ben_key != d_zhi_key else ''}
-                    </div>
-                </div>
-                """).strip()
-                
-                st.markdown(daily_html, unsafe_allow_html=True)
-
-    st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+            result = cast(1)
+            st.session_state["daily_cast"] = (question, int(result["ben"][0]), int(result["zhi"][0]))
+
+    if "daily_cast" in st.session_state:
+        asked, ben_code, zhi_code = st.session_state["daily_cast"]
+        with span("render.daily"):
+            st.markdown(f'<div class="cast-reveal">{daily_card_html(asked, ben_code, zhi_code)}</div>', unsafe_allow_html=True)
+
+    # 概率验证: 一次掷出大量卦，核对 6/7/8/9 的经验频率与理论值
+    with st.expander("📊 概率验证 (Monte Carlo)"):
+        mc1, mc2 = st.columns(2)
+        with mc1:
+            n_casts = st.number_input("起卦次数", min_value=1000, max_value=10_000_000, value=1_000_000, step=100_000)
+        with mc2:
+            seed = st.number_input("随机种子", min_value=0, value=42, step=1)
+        if st.button("运行模拟 (RUN)", use_container_width=True):
+            mc = cast(int(n_casts), seed=int(seed))
+            # 会话里只留汇总计数 (千万次起卦的逐卦数组约 30 MB)
+            st.session_state["mc_result"] = (mc["line_counts"], np.bincount(mc["moving_count"], minlength=7))
+        if "mc_result" in st.session_state:
+            line_counts, moving_counts = st.session_state["mc_result"]
+            table, chi2, p_value = line_frequency_check(line_counts)
+            st.dataframe(pd.DataFrame(table), use_container_width=True)
+            st.caption(f"卡方检验: χ² = {chi2:.3f} (df=3), p = {p_value:.3f}")
+            moving = moving_counts / moving_counts.sum()
+            st.bar_chart(pd.DataFrame({"动爻数": range(7), "频率": moving}).set_index("动爻数"))
+
+    render_debug_panel(spans)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# TABS
+tab_market, tab_screener, tab_daily = st.tabs(["📈 市场量化 (Tech)", "🔭 全市场筛选 (Screener)", "🎲 趣味问卜 (国潮)"])
+
+with tab_market:
+    render_market_tab()
+with tab_screener:
+    render_screener_tab()
+with tab_daily:
+    render_daily_tab()
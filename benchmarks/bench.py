@@ -0,0 +1,204 @@
+# --- 基准测试: 取数 / 计算 / 渲染 各阶段的吞吐与 p50/p99 延迟 ---
+# 用法: python -m benchmarks.bench [--sizes 10 1000 ...] [--output out.json] [--compare base.json]
+# 全部使用合成行情 + 本地替身数据源 (FrameProvider)，不联网
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from hexcore.backtest import hexagram_stats
+from hexcore.cards import asset_card_html, ben_card_html, get_hexagram_html, get_stats_html, transition_html, zhi_card_html
+from hexcore.engine import calculate_hexagram_batch, calculate_hexagram_series
+from hexcore.hexagrams import HEXAGRAM_TABLE, HEXAGRAMS, code_to_key
+from hexcore.markov import TransitionModel
+from hexcore.providers import FrameProvider
+from hexcore.store import PriceStore
+from hexcore.timeframes import TIMEFRAMES, ResampleCache, timeframe_hexagram
+
+SIZES = (10, 1_000, 100_000, 1_000_000, 10_000_000)
+DAILY_MAX = 50_000         # 约 190 年工作日；更大规模超出 pandas 日期范围，改用分钟线时间戳
+LOOKUP_MAX = 1_000_000
+RENDER_MAX = 100_000
+SYMBOL = "BENCH"
+BACKTEST_START = "2000-01-01"   # 与 app.py 相同: 回测统计 / 转移模型 / 多周期的历史起点
+MIN_TIME = 0.2             # 每项至少累计运行的秒数
+MIN_RUNS, MAX_RUNS = 5, 1000
+REGRESSION = 0.20          # 与基线相比 p50 变慢超过 20% 视为回归
+
+
+def make_ohlcv(n, seed=0):
+    # 合成行情: 对数随机游走，开收盘价带日内波动
+    rng = np.random.default_rng(seed)
+    if n <= DAILY_MAX:
+        index = pd.bdate_range(end="2024-12-31", periods=n)
+    else:
+        index = pd.date_range(end="2024-12-31", periods=n, freq="min")
+    closes = 70 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    opens = closes * (1 + rng.normal(0, 0.012, n))
+    return pd.DataFrame({
+        "Open": opens,
+        "High": np.maximum(opens, closes) * 1.005,
+        "Low": np.minimum(opens, closes) * 0.995,
+        "Close": closes,
+        "Volume": rng.integers(1_000, 100_000, n).astype(float),
+    }, index=index)
+
+
+def measure(fn, items=1):
+    # 反复运行直到累计 MIN_TIME 秒；返回每次耗时 (秒) 与每次处理的条目数
+    fn()  # 预热
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < MIN_RUNS or (time.perf_counter() - start < MIN_TIME and len(samples) < MAX_RUNS):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1e9)
+    samples = np.array(samples)
+    return {
+        "runs": len(samples),
+        "p50_ms": float(np.percentile(samples, 50) * 1e3),
+        "p99_ms": float(np.percentile(samples, 99) * 1e3),
+        "mean_ms": float(samples.mean() * 1e3),
+        "throughput": float(items / samples.mean()),
+    }
+
+
+def market_pipeline(store, symbol, end_date, model, resample_cache):
+    # 与市场页单品种视图相同的调用 (不含 Streamlit 本身与需要分时数据的小时线):
+    # 取数 -> 计算 -> 回测统计 -> 转移模型增量更新并落盘 -> 日/周/月线 -> 卡片 -> 明细表
+    # 合成行情都在今天之前，全部是已收盘 K 线，直接喂给转移模型
+    end = end_date + timedelta(days=1)
+    df = store.get(symbol, end_date - timedelta(days=40), end)
+    ben, zhi, details = calculate_hexagram_batch({symbol: df})[symbol]
+    history = store.get(symbol, BACKTEST_START, end)
+    stats = hexagram_stats({symbol: history})
+    if model.update_from_frame(symbol, history):
+        model.save(os.path.join(store.root, "markov.npz"))
+    timeframes = [
+        asset_card_html(spec["label"], timeframe_hexagram(resample_cache, (symbol, "daily"), history, tf, end_date)[0])
+        for tf, spec in TIMEFRAMES.items() if spec["base"] == "daily"
+    ]
+    html = (ben_card_html(ben, get_stats_html(stats, ben)) + zhi_card_html(ben, zhi)
+            + transition_html({"次日": model.distribution(ben, 1, symbol), "下周": model.distribution(ben, 5, symbol)})
+            + "".join(timeframes))
+    table = pd.DataFrame(details)
+    return html, table
+
+
+def run(sizes, stages=None):
+    records = []
+
+    def record(stage, size, unit, result, items=None):
+        # size 为合成行情的 K 线数；items 为每次调用实际处理的条目数 (查表/渲染封顶)
+        records.append(dict(stage=stage, size=size, items=items or size, unit=unit, **result))
+        print(f"{stage:<22}{size:>12,}  p50 {result['p50_ms']:>10.3f} ms  p99 {result['p99_ms']:>10.3f} ms"
+              f"  {result['throughput']:>14,.0f} {unit}/s", flush=True)
+
+    def wanted(stage):
+        return stages is None or stage in stages
+
+    for size in sizes:
+        df = make_ohlcv(size)
+        # 查表/渲染与行情长度无关，条目数封顶，避免 10M 个字符串键占满内存
+        lookup_n = min(size, LOOKUP_MAX)
+        codes = np.random.default_rng(size).integers(0, 64, lookup_n).tolist()
+        keys = [code_to_key(c) for c in codes]
+
+        if wanted("calculate_hexagram") and size >= 6:
+            record("calculate_hexagram", size, "bars", measure(lambda: calculate_hexagram_batch({SYMBOL: df}), size))
+        # 全历史引擎按 40 个自然日取窗口，只在日线口径的合成行情上有意义
+        if wanted("calculate_series") and 6 <= size <= DAILY_MAX:
+            record("calculate_series", size, "bars", measure(lambda: calculate_hexagram_series(df), size))
+        if wanted("lookup_table"):
+            record("lookup_table", size, "lookups", measure(lambda: [HEXAGRAM_TABLE[c] for c in codes], lookup_n), lookup_n)
+        if wanted("lookup_dict"):
+            record("lookup_dict", size, "lookups", measure(lambda: [HEXAGRAMS[k] for k in keys], lookup_n), lookup_n)
+        if wanted("render_cards"):
+            render_n = min(size, RENDER_MAX)
+            sample = codes[:render_n]
+            record("render_cards", size, "cards", measure(
+                lambda: [get_hexagram_html(c) + ben_card_html(c) + zhi_card_html(c, c ^ 1) for c in sample], render_n),
+                render_n)
+        # 市场页流程含全历史回测与转移模型，同样只在日线口径的合成行情上运行
+        if (wanted("pipeline_cold") or wanted("pipeline_warm")) and 6 <= size <= DAILY_MAX:
+            provider = FrameProvider({SYMBOL: df})
+            end_date = df.index[-1].normalize()
+            if wanted("pipeline_cold"):
+                # 每次都用空仓库与空模型: 包含一次 "下载" (替身数据源切片)、全量建模与落盘
+                def cold():
+                    with tempfile.TemporaryDirectory() as root:
+                        market_pipeline(PriceStore(root, provider, live_ttl=float("inf")), SYMBOL, end_date,
+                                        TransitionModel(), ResampleCache())
+                record("pipeline_cold", size, "requests", measure(cold))
+            if wanted("pipeline_warm"):
+                # 仓库、转移模型、重采样缓存跨请求复用，与 app 的 cache_resource 相同
+                with tempfile.TemporaryDirectory() as root:
+                    store = PriceStore(root, provider, live_ttl=float("inf"))
+                    model, resample_cache = TransitionModel(), ResampleCache()
+                    record("pipeline_warm", size, "requests",
+                           measure(lambda: market_pipeline(store, SYMBOL, end_date, model, resample_cache)))
+        del df
+    return records
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(records, baseline_path):
+    # 与基线结果逐项比较 p50，返回回归列表
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["stage"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in records:
+        base = baseline.get((r["stage"], r["size"]))
+        if base and r["p50_ms"] > base["p50_ms"] * (1 + REGRESSION):
+            regressions.append((r["stage"], r["size"], base["p50_ms"], r["p50_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="能源·周易量化 基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--stages", nargs="+", help="只运行指定阶段")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="基线结果 JSON，p50 变慢超过 20%% 时返回非零")
+    args = parser.parse_args(argv)
+
+    records = run(args.sizes, set(args.stages) if args.stages else None)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": records,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    if args.compare:
+        regressions = compare(records, args.compare)
+        for stage, size, base, now in regressions:
+            print(f"回归: {stage} @ {size:,}: p50 {base:.3f} ms -> {now:.3f} ms")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# 能源·周易量化 —— 计算核心 (不依赖 Streamlit)
+# 子模块按需导入 (PEP 562)：`import hexcore` 本身不加载 numpy / pandas / yfinance
+import importlib
+
+_EXPORTS = {
+    "hexagram_stats": "backtest",
+    "label_history": "backtest",
+    "cast": "casting",
+    "cast_lines": "casting",
+    "line_frequency_check": "casting",
+    "calculate_hexagram": "engine",
+    "calculate_hexagram_batch": "engine",
+    "calculate_hexagram_series": "engine",
+    "hexagram_arrays": "engine",
+    "latest_hexagrams": "engine",
+    "line_values": "engine",
+    "price_arrays": "engine",
+    "HEXAGRAM_TABLE": "hexagrams",
+    "HEXAGRAMS": "hexagrams",
+    "code_to_key": "hexagrams",
+    "key_to_code": "hexagrams",
+    "write_journal": "journal",
+    "TRACER": "instrument",
+    "count": "instrument",
+    "span": "instrument",
+    "timed": "instrument",
+    "TransitionModel": "markov",
+    "FrameProvider": "providers",
+    "YFinanceProvider": "providers",
+    "fetch_many": "providers",
+    "filter_scan": "screener",
+    "scan": "screener",
+    "PriceStore": "store",
+    "run_sweep": "sweep",
+    "HexagramStream": "stream",
+    "StreamSubscription": "stream",
+    "iter_bars": "stream",
+    "TIMEFRAMES": "timeframes",
+    "ResampleCache": "timeframes",
+    "timeframe_hexagram": "timeframes",
+    "UNIVERSE": "universe",
+    "load_universe": "universe",
+    "universe_symbols": "universe",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
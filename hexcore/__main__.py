@@ -0,0 +1,4 @@
+# python -m hexcore ...
+from .cli import main
+
+main()
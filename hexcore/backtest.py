@@ -0,0 +1,57 @@
+# --- 卦象回测: 给每根 K 线贴上卦象标签，统计其后 1/5/20 日的表现 ---
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .engine import LOOKBACK_DAYS, VOLATILITY_MULTIPLIER, calculate_hexagram_series, price_arrays
+from .instrument import timed
+
+HORIZONS = (1, 5, 20)
+
+
+def forward_returns(closes, horizon):
+    # fwd[t] = close[t+h] / close[t] - 1，末尾不足 h 根的为 NaN
+    out = np.full(len(closes), np.nan)
+    if len(closes) > horizon:
+        out[:-horizon] = closes[horizon:] / closes[:-horizon] - 1
+    return out
+
+
+def forward_drawdowns(closes, horizon):
+    # 持有 h 日期间相对入场价的最大回撤 (收盘价口径，<= 0)
+    out = np.full(len(closes), np.nan)
+    if len(closes) > horizon:
+        worst = sliding_window_view(closes[1:], horizon).min(axis=1)
+        out[:-horizon] = np.minimum(worst / closes[:-horizon] - 1, 0.0)
+    return out
+
+
+def label_history(df, horizons=HORIZONS, lookback_days=LOOKBACK_DAYS, multiplier=VOLATILITY_MULTIPLIER):
+    # 单个品种: 卦象标签 + 各持有期的前瞻收益与回撤
+    labels = calculate_hexagram_series(df, lookback_days, multiplier)[["valid", "ben", "zhi"]]
+    _, closes = price_arrays(df)
+    for h in horizons:
+        labels[f"ret_{h}d"] = forward_returns(closes, h)
+        labels[f"dd_{h}d"] = forward_drawdowns(closes, h)
+    return labels[labels.pop("valid")]
+
+
+@timed("backtest.stats")
+def hexagram_stats(frames, horizons=HORIZONS, by="ben", lookback_days=LOOKBACK_DAYS, multiplier=VOLATILITY_MULTIPLIER):
+    # 多品种汇总统计。by="ben" 按本卦编码分组，by="transition" 按 本卦→之卦 分组
+    # 返回列: count, ret_Nd (平均收益), hit_Nd (上涨概率), dd_Nd (平均最大回撤)
+    labeled = pd.concat(
+        [label_history(df, horizons, lookback_days, multiplier) for df in frames.values() if df is not None and len(df)],
+        ignore_index=True,
+    )
+    keys = ["ben"] if by == "ben" else ["ben", "zhi"]
+    agg = {}
+    for h in horizons:
+        labeled[f"hit_{h}d"] = np.where(labeled[f"ret_{h}d"].isna(), np.nan, labeled[f"ret_{h}d"] > 0)
+        agg[f"ret_{h}d"] = "mean"
+        agg[f"hit_{h}d"] = "mean"
+        agg[f"dd_{h}d"] = "mean"
+    grouped = labeled.groupby(keys, sort=True)
+    stats = grouped.agg(agg)
+    stats.insert(0, "count", grouped.size())
+    return stats
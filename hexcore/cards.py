@@ -0,0 +1,197 @@
+# --- 卡片 HTML: 与卦象相关的静态部分在导入时一次性渲染，运行时只拼接动态字段 ---
+# 全部压成单行，避免 st.markdown 把缩进当成代码块
+from .backtest import HORIZONS
+from .hexagrams import HEXAGRAM_TABLE, N_LINES
+
+_YANG = '<div class="line-yang"></div>'
+_YIN = '<div class="line-yin"><div class="line-yin-part"></div><div class="line-yin-part"></div></div>'
+
+
+def _render_lines(code):
+    # 视觉显示 Top->Bottom (上->初)，所以从高位往低位画
+    bits = ((code >> k) & 1 for k in reversed(range(N_LINES)))
+    return f'<div class="hex-container">{"".join(_YANG if bit else _YIN for bit in bits)}</div>'
+
+
+def _render_text(info):
+    # 市场页卡片下半部分: 卦辞 + 解读
+    interp = info['interp'].replace('\n', '')
+    return (
+        f'<div style="font-size:14px; font-style:italic; color:#64748b;">{info["judgment"]}</div>'
+        f'<hr style="margin:10px 0; border-top: 1px solid #e2e8f0;">'
+        f'<div style="text-align:left; font-size:13px; line-height:1.6;">{interp}</div>'
+    )
+
+
+def _render_daily_side(code, title):
+    info = HEXAGRAM_TABLE[code]
+    return (
+        f'<div style="font-size:12px; color:#888; margin-bottom:8px;">{title}</div>'
+        f'{HEX_HTML[code]}'
+        f'<div class="calligraphy" style="font-size:32px; margin-top:8px; color:#333;">{info["name"]}</div>'
+        f'<div style="font-size:13px; color:#666;">{info["judgment"]}</div>'
+    )
+
+
+# 卦画与卡片样式，Streamlit 页面和静态日志 (journal) 共用
+CARD_CSS = """
+/* CSS 绘制卦象 (解决手机不显示问题) */
+.hex-container {
+    display: flex;
+    flex-direction: column-reverse; /* 从下往上画 */
+    gap: 5px;
+    width: 80px;
+    margin: 0 auto;
+}
+.line-yang {
+    width: 100%;
+    height: 12px;
+    background-color: #b91c1c; /* 朱砂红 */
+    border-radius: 4px;
+    box-shadow: 0 2px 4px rgba(185, 28, 28, 0.2);
+}
+.line-yin {
+    display: flex;
+    justify-content: space-between;
+    width: 100%;
+    height: 12px;
+}
+.line-yin-part {
+    width: 42%;
+    height: 100%;
+    background-color: #1f2937; /* 墨色 */
+    border-radius: 4px;
+    box-shadow: 0 2px 4px rgba(31, 41, 55, 0.2);
+}
+
+/* 结果卡片样式 */
+.result-card {
+    background: white;
+    padding: 25px;
+    border-radius: 20px;
+    box-shadow: 0 10px 25px -5px rgba(0, 0, 0, 0.1);
+    border: 1px solid #e2e8f0;
+    text-align: center;
+    margin-bottom: 20px;
+}
+"""
+
+HEX_HTML = tuple(_render_lines(code) for code in range(64))
+CARD_TEXT = tuple(_render_text(info) for info in HEXAGRAM_TABLE)
+DAILY_BEN = tuple(_render_daily_side(code, "本卦 (现状)") for code in range(64))
+DAILY_ZHI = tuple(_render_daily_side(code, "之卦 (变数)") for code in range(64))
+DAILY_INTERP = tuple(info['interp'].replace('\n', '') for info in HEXAGRAM_TABLE)
+
+
+def get_hexagram_html(code):
+    return HEX_HTML[code]
+
+
+def get_stats_html(stats, code):
+    # 本卦的历史回测表现 (前瞻收益 / 上涨概率 / 平均最大回撤)
+    if stats is None or code not in stats.index:
+        return '<div style="margin-top:10px; font-size:12px; color:#94a3b8;">历史回测: 暂无样本</div>'
+    row = stats.loc[code]
+    rows = "".join(
+        f'<tr><td style="padding:2px 6px;">{h}日</td>'
+        f'<td style="padding:2px 6px;">{row[f"ret_{h}d"]*100:+.2f}%</td>'
+        f'<td style="padding:2px 6px;">胜率 {row[f"hit_{h}d"]*100:.0f}%</td>'
+        f'<td style="padding:2px 6px;">回撤 {row[f"dd_{h}d"]*100:.2f}%</td></tr>'
+        for h in HORIZONS
+    )
+    return (
+        f'<div style="margin-top:10px; font-size:12px; color:#475569;">'
+        f'<div style="font-weight:bold;">📊 历史回测 (样本 {int(row["count"])})</div>'
+        f'<table style="margin:0 auto;">{rows}</table></div>'
+    )
+
+
+def transition_html(distributions, top=3):
+    # 马尔可夫转移: {标签: 64 维概率}，列出每个持有期最可能的几个本卦
+    blocks = []
+    for label, dist in distributions.items():
+        if not dist.any():
+            blocks.append(f'<div>{label}: 暂无样本</div>')
+            continue
+        best = dist.argsort()[::-1][:top]
+        items = " · ".join(f'{HEXAGRAM_TABLE[code]["name"]} {dist[code]*100:.0f}%' for code in best if dist[code] > 0)
+        blocks.append(f'<div>{label}: {items}</div>')
+    return (
+        f'<div class="result-card" style="font-size:13px; color:#475569; text-align:left;">'
+        f'<div style="font-weight:bold; margin-bottom:5px;">🔮 转移概率 (Markov)</div>{"".join(blocks)}</div>'
+    )
+
+
+def ben_card_html(ben, stats_html=""):
+    return (
+        f'<div class="result-card">'
+        f'<div style="color:#64748b; font-weight:bold; font-size:12px; margin-bottom:5px;">CURRENT PHASE (本卦)</div>'
+        f'{HEX_HTML[ben]}'
+        f'<div style="font-size:24px; font-weight:bold; margin-top:10px;">{HEXAGRAM_TABLE[ben]["name"]}</div>'
+        f'{CARD_TEXT[ben]}{stats_html}</div>'
+    )
+
+
+def hexagram_card_html(code):
+    # 单卦卡片 (静态日志里每卦只渲染一次)
+    return (
+        f'<div class="result-card">'
+        f'{HEX_HTML[code]}'
+        f'<div style="font-size:24px; font-weight:bold; margin-top:10px;">{HEXAGRAM_TABLE[code]["name"]}</div>'
+        f'{CARD_TEXT[code]}</div>'
+    )
+
+
+def zhi_card_html(ben, zhi):
+    opacity = "1" if ben != zhi else "0.5"
+    suffix = "(变卦)" if ben != zhi else "(无变动)"
+    return (
+        f'<div class="result-card" style="opacity:{opacity};">'
+        f'<div style="color:#64748b; font-weight:bold; font-size:12px; margin-bottom:5px;">PROJECTION (之卦)</div>'
+        f'{HEX_HTML[zhi]}'
+        f'<div style="font-size:24px; font-weight:bold; margin-top:10px;">{HEXAGRAM_TABLE[zhi]["name"]} {suffix}</div>'
+        f'{CARD_TEXT[zhi]}</div>'
+    )
+
+
+def asset_card_html(label, result, stats=None):
+    # 多品种对比用的紧凑卡片
+    if result is None:
+        body = '<div style="color:#94a3b8; margin-top:20px;">数据不足</div>'
+    else:
+        ben, zhi, _ = result
+        info = HEXAGRAM_TABLE[ben]
+        change = f"→ {HEXAGRAM_TABLE[zhi]['name']}" if ben != zhi else "(无变动)"
+        body = (
+            f'{HEX_HTML[ben]}'
+            f'<div style="font-size:22px; font-weight:bold; margin-top:10px;">{info["name"]} '
+            f'<span style="font-size:14px; color:#64748b;">{change}</span></div>'
+            f'<div style="font-size:13px; font-style:italic; color:#64748b;">{info["judgment"]}</div>'
+            f'{get_stats_html(stats, ben)}'
+        )
+    return (
+        f'<div class="result-card">'
+        f'<div style="color:#64748b; font-weight:bold; font-size:12px; margin-bottom:8px;">{label}</div>'
+        f'{body}</div>'
+    )
+
+
+def daily_card_html(question, ben, zhi):
+    changed = ben != zhi
+    hint = (
+        f'<div style="margin-top:10px; font-size:13px; color:#d97706;">⚡ <strong>变爻启示：</strong>'
+        f'局势正在向 {HEXAGRAM_TABLE[zhi]["name"]} 转变，请参考之卦建议。</div>'
+    ) if changed else ''
+    return (
+        f'<div class="result-card" style="background-color:#fffbf0; border:2px solid #b91c1c; padding:20px;">'
+        f'<div style="text-align:center; margin-bottom:20px; color:#b91c1c; font-weight:bold; font-size:18px;">问：{question}</div>'
+        f'<div style="display:flex; justify-content:space-around; align-items:flex-start;">'
+        f'<div style="text-align:center; flex:1;">{DAILY_BEN[ben]}</div>'
+        f'<div style="text-align:center; flex:1; opacity: {1.0 if changed else 0.3};">{DAILY_ZHI[zhi]}</div>'
+        f'</div>'
+        f'<hr style="border-color:#e5e7eb; margin:20px 0;">'
+        f'<div style="background:rgba(255,255,255,0.6); padding:15px; border-radius:8px; border:1px dashed #d1d5db;">'
+        f'<p style="font-weight:bold; color:#b91c1c; margin-bottom:5px;">💡 锦囊妙计：</p>'
+        f'<div style="line-height:1.6; font-size:14px; color:#333;">{DAILY_INTERP[ben]}</div>'
+        f'{hint}</div></div>'
+    )
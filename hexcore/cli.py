@@ -0,0 +1,266 @@
+# --- 命令行入口: python -m hexcore {series,cast,journal,import,sweep} ---
+# 脚本任务不经过 Streamlit / yfinance；CSV 读写只用标准库 + numpy，
+# pandas 仅在读写 Parquet 或日期格式无法直接解析时才导入
+import argparse
+import csv
+import os
+import re
+import sys
+
+import numpy as np
+
+from .engine import LOOKBACK_DAYS, VOLATILITY_MULTIPLIER, format_dates, hexagram_arrays
+from .hexagrams import HEXAGRAM_NAMES, N_LINES
+
+METHODS = ("mean", "median", "ewm")
+OUTPUT_COLUMNS = ["symbol", "date", "ben", "zhi", "moving", "ben_name", "zhi_name"] + [f"line_{k}" for k in range(N_LINES)]
+
+_TZ_SUFFIX = re.compile(r"(Z|[+-]\d\d:?\d\d)$")
+
+
+def _parse_dates(values):
+    # "2024-01-02" / "2024-01-02 00:00:00-05:00" -> datetime64[ns]，时区只去掉后缀 (保留当地时间)
+    cleaned = [_TZ_SUFFIX.sub("", v.strip()) if len(v) > 10 else v.strip() for v in values]
+    try:
+        return np.array(cleaned, dtype="datetime64[ns]")
+    except ValueError:
+        import pandas as pd
+
+        return np.asarray(pd.to_datetime(values, utc=True).tz_localize(None), dtype="datetime64[ns]")
+
+
+def _read_csv(path):
+    # 第一列为日期 (DataFrame.to_csv 默认格式)，按列名取 Open / Close；
+    # 也接受 yfinance 多层列的 to_csv 输出 (Price / Ticker / Date 三行表头，只取单个品种)
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = [row for row in reader if row and row[0]]
+    skip = 0
+    while skip < len(rows) and rows[skip][0] in ("Ticker", "Date", "Datetime"):
+        skip += 1
+    rows = rows[skip:]
+    if header.count("Open") > 1:
+        raise ValueError(f"{path}: contains several tickers; export one symbol per file")
+    if not rows:
+        return np.empty(0, dtype="datetime64[ns]"), np.empty(0), np.empty(0)
+    date_col = next((i for i, name in enumerate(header) if name in ("Date", "Datetime")), 0)
+    columns = list(zip(*rows))
+    dates = _parse_dates(columns[date_col])
+    opens = np.array(columns[header.index("Open")], dtype=float)
+    closes = np.array(columns[header.index("Close")], dtype=float)
+    return dates, opens, closes
+
+
+def _read_parquet(path):
+    import pandas as pd
+
+    from .engine import index_dates, price_arrays
+
+    df = pd.read_parquet(path)
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df = df.set_index(df.columns[0])
+    opens, closes = price_arrays(df)
+    return index_dates(df), opens, closes
+
+
+def read_ohlcv(path):
+    # 返回按时间升序的 (dates, opens, closes)
+    if path.endswith(".parquet"):
+        dates, opens, closes = _read_parquet(path)
+    else:
+        dates, opens, closes = _read_csv(path)
+    if len(dates) > 1 and (np.diff(dates) < np.timedelta64(0)).any():
+        order = np.argsort(dates, kind="stable")
+        dates, opens, closes = dates[order], opens[order], closes[order]
+    return dates, opens, closes
+
+
+def expand_inputs(paths):
+    # 文件或目录 -> {symbol: path}，品种名取文件名
+    inputs = {}
+    for path in paths:
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+        for file in files:
+            symbol, ext = os.path.splitext(os.path.basename(file))
+            if ext in (".csv", ".parquet"):
+                inputs[symbol] = file
+    return inputs
+
+
+def select_rows(dates, valid, at=None, start=None, end=None):
+    # at: 每个日期取当天或之前最后一根 K 线；否则取 [start, end) 内全部有效行
+    if at is not None:
+        idx = np.searchsorted(dates, at + np.timedelta64(1, "D"), side="left") - 1
+        idx = np.unique(idx[idx >= 0])
+        return idx[valid[idx]]
+    mask = valid.copy()
+    if start is not None:
+        mask &= dates >= start
+    if end is not None:
+        mask &= dates < end
+    return np.flatnonzero(mask)
+
+
+def series_rows(symbol, dates, result, rows):
+    ben, zhi = result["ben"][rows], result["zhi"][rows]
+    columns = [
+        [symbol] * len(rows),
+        format_dates(dates[rows]),
+        ben.tolist(),
+        zhi.tolist(),
+        result["moving"][rows].tolist(),
+        HEXAGRAM_NAMES[ben].tolist(),
+        HEXAGRAM_NAMES[zhi].tolist(),
+    ] + [result[f"line_{k}"][rows].tolist() for k in range(N_LINES)]
+    return zip(*columns)
+
+
+def _day(value):
+    return None if value is None else np.datetime64(value, "ns")
+
+
+def run_series(args):
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        raise SystemExit("未找到 CSV / Parquet 输入文件")
+    at = np.array(args.dates, dtype="datetime64[ns]") if args.dates else None
+    start, end = _day(args.start), _day(args.end)
+
+    to_parquet = bool(args.output) and args.output.endswith(".parquet")
+    collected = []
+    out = sys.stdout if not args.output or to_parquet else open(args.output, "w", newline="")
+    try:
+        writer = csv.writer(out, lineterminator="\n")
+        if not to_parquet:
+            writer.writerow(OUTPUT_COLUMNS)
+        for symbol, path in inputs.items():
+            dates, opens, closes = read_ohlcv(path)
+            result = hexagram_arrays(dates, opens, closes, args.lookback_days, args.multiplier, args.method)
+            rows = series_rows(symbol, dates, result, select_rows(dates, result["valid"], at, start, end))
+            if to_parquet:
+                collected.extend(rows)
+            else:
+                writer.writerows(rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if to_parquet:
+        import pandas as pd
+
+        pd.DataFrame(collected, columns=OUTPUT_COLUMNS).to_parquet(args.output, index=False)
+
+
+def run_cast(args):
+    from .casting import cast, line_frequency_check
+
+    result = cast(args.n, seed=args.seed)
+    if args.n == 1:
+        ben, zhi = int(result["ben"][0]), int(result["zhi"][0])
+        print(f"本卦 {HEXAGRAM_NAMES[ben]} ({ben}) -> 之卦 {HEXAGRAM_NAMES[zhi]} ({zhi})，动爻 {int(result['moving_count'][0])} 个")
+        return
+    table, chi2, p = line_frequency_check(result["line_counts"])
+    print("line,count,empirical,theoretical")
+    for row in zip(*table.values()):
+        print(f"{row[0]},{row[1]},{row[2]:.6f},{row[3]:.6f}")
+    print(f"chi2={chi2:.4f} p={p:.4f}")
+
+
+def run_journal(args):
+    from .journal import write_journal
+
+    if args.store:
+        from .store import COLUMNS, PriceStore
+
+        store = PriceStore(args.store, offline=True)
+        symbols = args.inputs or store.symbols()
+        o, c = COLUMNS.index("Open"), COLUMNS.index("Close")
+
+        def load(symbol):
+            dates, values = store.arrays(symbol, cache=False)
+            return dates, values[:, o], values[:, c]
+    else:
+        inputs = expand_inputs(args.inputs)
+        symbols = list(inputs)
+
+        def load(symbol):
+            return read_ohlcv(inputs[symbol])
+
+    if not symbols:
+        raise SystemExit("没有可写入日志的品种")
+    try:
+        written = write_journal(args.output, symbols, load, args.chunk_rows, args.lookback_days, args.multiplier, not args.no_html)
+    except ValueError as e:
+        # 输出目录参数不一致、输入文件格式不对等: 直接给出原因，不打印堆栈
+        raise SystemExit(str(e)) from None
+    print(f"写入 {len(written)} 个品种，跳过 {len(symbols) - len(written)} 个已完成品种 -> {args.output}")
+
+
+def run_import(args):
+    # 离线 / 回放: 把 CSV / Parquet 行情导入本地仓库，之后 HEX_OFFLINE=1 的 app 与 --offline 的 sweep 直接可用
+    from .store import DEFAULT_ROOT, PriceStore
+
+    inputs = expand_inputs(args.inputs)
+    if args.symbol:
+        if len(inputs) != 1:
+            raise SystemExit("--symbol 只能配合单个输入文件使用")
+        inputs = {args.symbol: next(iter(inputs.values()))}
+    if not inputs:
+        raise SystemExit("未找到 CSV / Parquet 输入文件")
+    store = PriceStore(args.store or DEFAULT_ROOT, offline=True)
+    for symbol, path in inputs.items():
+        store.import_file(symbol, path)
+        dates, _ = store.arrays(symbol, cache=False)
+        print(f"{symbol}: {len(dates)} 根 K 线 <- {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m hexcore", description="能源·周易量化 —— 批量计算")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    series = commands.add_parser("series", help="从 CSV / Parquet 行情批量计算卦象序列")
+    series.add_argument("inputs", nargs="+", help="行情文件或目录 (<symbol>.csv / <symbol>.parquet)")
+    series.add_argument("--dates", nargs="+", help="只输出这些日期 (取当天或之前最后一根 K 线)")
+    series.add_argument("--start", help="输出起始日期 (含)")
+    series.add_argument("--end", help="输出截止日期 (不含)")
+    series.add_argument("--lookback-days", type=int, default=LOOKBACK_DAYS)
+    series.add_argument("--multiplier", type=float, default=VOLATILITY_MULTIPLIER)
+    series.add_argument("--method", default="mean", choices=METHODS)
+    series.add_argument("--output", "-o", help="输出文件 (.csv / .parquet)，默认写到标准输出")
+
+    casting = commands.add_parser("cast", help="模拟铜钱起卦")
+    casting.add_argument("-n", type=int, default=1, help="起卦次数；大于 1 时输出爻值频率检验")
+    casting.add_argument("--seed", type=int, default=None)
+
+    journal = commands.add_parser("journal", help="导出历史卦象日志 (Parquet + 静态 HTML，可断点续跑)")
+    journal.add_argument("inputs", nargs="*", help="行情文件或目录；配合 --store 时为品种代码 (留空 = 仓库内全部品种)")
+    journal.add_argument("--store", help="从本地行情仓库目录读取 (只读，不联网)")
+    journal.add_argument("--output", "-o", required=True, help="输出目录")
+    journal.add_argument("--chunk-rows", type=int, default=50_000)
+    journal.add_argument("--lookback-days", type=int, default=LOOKBACK_DAYS)
+    journal.add_argument("--multiplier", type=float, default=VOLATILITY_MULTIPLIER)
+    journal.add_argument("--no-html", action="store_true", help="只写 Parquet")
+
+    importing = commands.add_parser("import", help="把 CSV / Parquet 行情导入本地行情仓库 (供离线模式使用)")
+    importing.add_argument("inputs", nargs="+", help="行情文件或目录；品种代码取文件名 (<symbol>.csv / <symbol>.parquet)")
+    importing.add_argument("--symbol", help="单个文件时指定品种代码")
+    importing.add_argument("--store", help="行情仓库目录 (默认 HEX_STORE_DIR 或 ~/.cache/hex-store)")
+
+    commands.add_parser("sweep", help="模型参数扫描 (参数同 python -m hexcore.sweep)", add_help=False)
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["sweep"]:
+        # 参数原样交给 sweep 自己的解析器 (含 --help)
+        from .sweep import main as sweep_main
+
+        return sweep_main(argv[1:])
+    args = parser.parse_args(argv)
+    if args.command == "series":
+        run_series(args)
+    elif args.command == "journal":
+        run_journal(args)
+    elif args.command == "import":
+        run_import(args)
+    else:
+        run_cast(args)
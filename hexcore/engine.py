@@ -0,0 +1,198 @@
+# --- 向量化卦象引擎: 一次计算整段行情中每一根 K 线的本卦/之卦 ---
+# 只依赖 numpy；pandas 仅在需要 DataFrame 输入/输出或 ewm 时才导入
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .hexagrams import N_LINES
+from .instrument import timed
+
+LOOKBACK_DAYS = 40        # 与市场页 yf.download 的取数窗口一致 (自然日)
+VOLATILITY_MULTIPLIER = 1.5
+_CHUNK_ELEMS = 1 << 22    # 分块求窗口统计，每块最多这么多个元素，控制内存
+
+_BIT_WEIGHTS = (1 << np.arange(N_LINES)).astype(np.uint8)
+
+
+def price_arrays(df):
+    # 兼容 yfinance 单列 DataFrame / Series，统一成一维 float 数组
+    opens = np.asarray(df['Open'], dtype=float).reshape(-1)
+    closes = np.asarray(df['Close'], dtype=float).reshape(-1)
+    return opens, closes
+
+
+def line_values(opens, closes, threshold):
+    # 逐元素判定爻值: 阳 7 / 阴 8，波动超过阈值为动爻 (老阳 9 / 老阴 6)
+    is_up = closes >= opens
+    is_moving = np.abs((closes - opens) / opens) > threshold
+    return np.where(is_up, np.where(is_moving, 9, 7), np.where(is_moving, 6, 8)).astype(np.int8)
+
+
+def lines_to_codes(lines):
+    # lines: (..., 6) 爻值 -> 本卦编码、动爻掩码 (均为 uint8)
+    # 7/9 为奇数即阳爻；之卦 = 本卦 ^ 动爻掩码
+    ben = ((lines & 1) * _BIT_WEIGHTS).sum(axis=-1).astype(np.uint8)
+    moving = (((lines == 6) | (lines == 9)) * _BIT_WEIGHTS).sum(axis=-1).astype(np.uint8)
+    return ben, moving
+
+
+def _window_starts(dates, lookback_days):
+    # 每根 K 线对应取数窗口 [date - lookback_days, date] 的起始下标
+    return np.searchsorted(dates, dates - np.timedelta64(lookback_days, 'D'), side='left')
+
+
+def _window_reduce(changes, starts, counts, reducer):
+    # 变长窗口统计。按窗口长度分组，用 sliding_window_view 整块计算，
+    # 与单日模型里 changes.mean() 的求和顺序一致，结果逐位相同
+    out = np.empty(len(changes))
+    for length in np.unique(counts):
+        rows = np.flatnonzero(counts == length)
+        windows = sliding_window_view(changes, length)
+        step = max(1, _CHUNK_ELEMS // length)
+        for lo in range(0, len(rows), step):
+            block = rows[lo:lo + step]
+            out[block] = reducer(windows[starts[block]], axis=1)
+    return out
+
+
+def volatility_baseline(dates, changes, lookback_days=LOOKBACK_DAYS, method="mean"):
+    # 每根 K 线取数窗口内的"平均"波动，以及窗口内 K 线数
+    #   mean   简单均值 (默认，即原模型)
+    #   median 中位数，对单日暴涨暴跌不敏感
+    #   ewm    指数加权，半衰期取与等长简单均值平均滞后相同的 lookback/2 * ln2 天
+    starts = _window_starts(dates, lookback_days)
+    counts = np.arange(len(changes)) - starts + 1
+    if method == "mean":
+        baseline = _window_reduce(changes, starts, counts, np.mean)
+    elif method == "median":
+        baseline = _window_reduce(changes, starts, counts, np.median)
+    elif method == "ewm":
+        import pandas as pd
+
+        halflife = pd.Timedelta(days=lookback_days / 2 * np.log(2))
+        baseline = pd.Series(changes).ewm(halflife=halflife, times=pd.DatetimeIndex(dates)).mean().to_numpy()
+    else:
+        raise ValueError(f"Unknown averaging method: {method}")
+    return baseline, counts
+
+
+def series_lines(opens, closes, threshold, valid):
+    # 每根 K 线的六爻: 第 k 爻 = 往前数第 k 根 K 线 (k=0 为当日)，无效行为 0
+    n = len(closes)
+    lines = np.zeros((n, N_LINES), dtype=np.int8)
+    if n >= N_LINES:
+        rows = np.arange(N_LINES - 1, n)
+        bars = rows[:, None] - np.arange(N_LINES)[None, :]
+        lines[rows] = line_values(opens[bars], closes[bars], threshold[rows][:, None])
+    lines[~valid] = 0
+    return lines
+
+
+def index_dates(df):
+    import pandas as pd
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[ns]')
+
+
+def format_dates(dates):
+    # datetime64 数组 -> 字符串；全部是零点时只保留日期部分
+    unit = "D" if (dates == dates.astype("datetime64[D]")).all() else "s"
+    return np.datetime_as_string(dates, unit=unit)
+
+
+def hexagram_arrays(dates, opens, closes, lookback_days=LOOKBACK_DAYS, multiplier=VOLATILITY_MULTIPLIER, method="mean"):
+    # 纯数组版本 (dates 为升序 datetime64[ns])，返回与 calculate_hexagram_series 同名的各列
+    changes = np.abs((closes - opens) / opens)
+    baseline, counts = volatility_baseline(dates, changes, lookback_days, method)
+    valid = counts >= N_LINES
+    lines = series_lines(opens, closes, baseline * multiplier, valid)
+
+    ben, moving = lines_to_codes(lines)
+    out = {"valid": valid, "ben": ben, "zhi": ben ^ moving, "moving": moving}
+    for k in range(N_LINES):
+        out[f"line_{k}"] = lines[:, k]
+    return out
+
+
+@timed("engine.series")
+def calculate_hexagram_series(df, lookback_days=LOOKBACK_DAYS, multiplier=VOLATILITY_MULTIPLIER, method="mean"):
+    # 输入整段 OHLCV (按日期升序)，输出每根 K 线作为基准日时的卦象:
+    #   valid            窗口内是否有至少 6 根 K 线 (否则其余列无意义)
+    #   ben / zhi        本卦、之卦编码 (uint8, 0-63)
+    #   moving           动爻掩码 (uint8)
+    #   line_0..line_5   爻值 6/7/8/9 (line_0 为初爻 = 最新一根)
+    import pandas as pd
+
+    opens, closes = price_arrays(df)
+    out = hexagram_arrays(index_dates(df), opens, closes, lookback_days, multiplier, method)
+    return pd.DataFrame(out, index=df.index)
+
+
+@timed("engine.calculate")
+def calculate_hexagram_batch(frames, multiplier=VOLATILITY_MULTIPLIER):
+    # 多品种一次计算: {symbol: df} -> {symbol: (ben_code, zhi_code, details)}
+    # 与单品种模型相同，阈值取各自整个 df 的平均波动 * multiplier；不足 6 根 K 线的品种返回 None
+    results = {symbol: None for symbol in frames}
+    symbols, opens, closes, thresholds, dates = [], [], [], [], []
+    for symbol, df in frames.items():
+        if df is None or len(df) < N_LINES:
+            continue
+        o, c = price_arrays(df)
+        symbols.append(symbol)
+        thresholds.append(np.abs((c - o) / o).mean() * multiplier)
+        # 取最后6天并倒序 (i=0是最新 = 初爻)
+        opens.append(o[-N_LINES:][::-1])
+        closes.append(c[-N_LINES:][::-1])
+        dates.append(df.index[-N_LINES:][::-1])
+    if not symbols:
+        return results
+
+    opens, closes = np.array(opens), np.array(closes)
+    lines = line_values(opens, closes, np.array(thresholds)[:, None])
+    ben, moving = lines_to_codes(lines)
+    zhi = ben ^ moving
+    changes = (closes - opens) / opens
+
+    for row, symbol in enumerate(symbols):
+        details = [
+            {
+                "date": dates[row][i].strftime('%Y-%m-%d'),
+                "close": float(closes[row, i]),
+                "change": float(changes[row, i]),
+                "type": int(lines[row, i]),
+                "position": i
+            }
+            for i in range(N_LINES)
+        ]
+        results[symbol] = (int(ben[row]), int(zhi[row]), details)
+    return results
+
+
+def latest_hexagrams(opens, closes, counts, multiplier=VOLATILITY_MULTIPLIER):
+    # 多品种截面: opens/closes 为 (品种数, W) 右对齐矩阵 (最后一列 = 最新一根，左侧 NaN 补齐)，
+    # counts 为每行实际 K 线数。阈值取每行有效部分的平均波动，六爻取最后 6 列；
+    # 按行长度分组求均值，与 calculate_hexagram_batch 逐位一致。不足 6 根的行 valid=False
+    counts = np.asarray(counts)
+    width = opens.shape[1]
+    if width < N_LINES:
+        pad = np.full((len(counts), N_LINES - width), np.nan)
+        opens, closes, width = np.hstack([pad, opens]), np.hstack([pad, closes]), N_LINES
+    changes = np.abs((closes - opens) / opens)
+    threshold = np.zeros(len(counts))
+    for length in np.unique(counts[counts >= N_LINES]):
+        rows = np.flatnonzero(counts == length)
+        threshold[rows] = changes[rows, width - length:].mean(axis=1) * multiplier
+    valid = counts >= N_LINES
+    # 最后 6 列倒序: 第 0 爻 = 最新一根
+    lines = line_values(opens[:, :-N_LINES - 1:-1], closes[:, :-N_LINES - 1:-1], threshold[:, None])
+    lines[~valid] = 0
+    ben, moving = lines_to_codes(lines)
+    return {"valid": valid, "ben": ben, "zhi": ben ^ moving, "moving": moving, "lines": lines}
+
+
+def calculate_hexagram(df, multiplier=VOLATILITY_MULTIPLIER):
+    # 单品种、单基准日: 阈值取整个 df 的平均波动，六爻取最后 6 根 K 线
+    # 返回 (本卦编码, 之卦编码, 六爻明细)
+    return calculate_hexagram_batch({"": df}, multiplier)[""]
@@ -0,0 +1,94 @@
+# --- 六十四卦数据与 6 位整数编码 ---
+# 编码: bit k = 第 k 爻 (k=0 为初爻)，阳为 1。例如 "1,1,0,0,1,0" -> 0b010011 = 19
+# 本卦 -> 之卦: zhi = ben ^ moving (moving 为动爻掩码)
+import numpy as np
+
+N_LINES = 6
+
+# 原始数据 (字符串键，便于人工校对)
+HEXAGRAMS = {
+    "1,1,1,1,1,1": {"name": "乾", "judgment": "元亨利贞。", "interp": "【大象】天行健，君子以自强不息。<br>【量化】多头强势，动能充沛，如飞龙在天。<br>【策略】顺势做多，但需警惕高位滞涨。<br>【生活】运势极佳，适合大展宏图，忌骄傲。", "outlook": "bullish"},
+    "0,0,0,0,0,0": {"name": "坤", "judgment": "元亨，利牝马之贞。", "interp": "【大象】地势坤，君子以厚德载物。<br>【量化】空头主导或底部盘整，波动率低。<br>【策略】不宜追高，适合定投或空仓观望。<br>【生活】包容忍耐，以静制动。", "outlook": "bearish"},
+    "1,0,0,0,1,0": {"name": "屯", "judgment": "元亨利贞。", "interp": "【大象】云雷屯。<br>【量化】筑底阶段，震荡剧烈，方向未明。<br>【策略】建仓需谨慎，控制仓位。<br>【生活】万事开头难，积蓄力量。", "outlook": "neutral"},
+    "0,1,0,0,0,1": {"name": "蒙", "judgment": "亨。", "interp": "【大象】山下出泉，蒙。<br>【量化】信息混沌，趋势不明，迷雾重重。<br>【策略】多看少动，等待信号。<br>【生活】局势不明朗，建议多咨询专家。", "outlook": "neutral"},
+    "1,1,1,0,1,0": {"name": "需", "judgment": "有孚，光亨。", "interp": "【大象】云上于天，需。<br>【量化】上涨趋势中的回调，需求在积蓄。<br>【策略】逢低吸纳，持仓待涨。<br>【生活】时机未到，耐心等待。", "outlook": "bullish"},
+    "0,1,0,1,1,1": {"name": "讼", "judgment": "有孚，窒惕。", "interp": "【大象】天与水违，讼。<br>【量化】多空分歧巨大，成交量放大但滞涨。<br>【策略】风险较高，建议减仓。<br>【生活】易生口角，以和为贵。", "outlook": "neutral"},
+    "0,1,0,0,0,0": {"name": "师", "judgment": "贞，丈人吉。", "interp": "【大象】地中有水，师。<br>【量化】空头排列，趋势性下跌，力量集中。<br>【策略】顺势做空，严守纪律。<br>【生活】需要严明的纪律和领导。", "outlook": "bearish"},
+    "0,0,0,0,1,0": {"name": "比", "judgment": "吉。", "interp": "【大象】地上有水，比。<br>【量化】板块轮动良好，市场情绪和谐。<br>【策略】跟随龙头，寻找补涨机会。<br>【生活】人际关系和谐，有贵人相助。", "outlook": "neutral"},
+    "1,1,1,0,1,1": {"name": "小畜", "judgment": "亨。密云不雨。", "interp": "【大象】风行天上，小畜。<br>【量化】上涨遇阻，窄幅震荡，蓄势待发。<br>【策略】高抛低吸，短期盘整。<br>【生活】积蓄力量，不可急于求成。", "outlook": "bullish"},
+    "1,1,0,1,1,1": {"name": "履", "judgment": "履虎尾。", "interp": "【大象】上天下泽，履。<br>【量化】高位震荡，风险积聚，如履薄冰。<br>【策略】设置止损，步步为营。<br>【生活】有惊无险，但须小心。", "outlook": "neutral"},
+    "1,1,1,0,0,0": {"name": "泰", "judgment": "小往大来。", "interp": "【大象】天地交，泰。<br>【量化】多头市场，量价齐升，极为顺畅。<br>【策略】积极做多，享受泡沫。<br>【生活】三阳开泰，非常吉利。", "outlook": "bullish"},
+    "0,0,0,1,1,1": {"name": "否", "judgment": "否之匪人。", "interp": "【大象】天地不交，否。<br>【量化】流动性枯竭，阴跌不止。<br>【策略】清仓离场，现金为王。<br>【生活】闭塞不通，宜退守。", "outlook": "bearish"},
+    "1,0,1,1,1,1": {"name": "同人", "judgment": "同人于野。", "interp": "【大象】天与火，同人。<br>【量化】市场共识形成，普涨行情。<br>【策略】重仓出击，跟随主流。<br>【生活】志同道合，利于团队。", "outlook": "bullish"},
+    "1,1,1,1,0,1": {"name": "大有", "judgment": "元亨。", "interp": "【大象】火在天上，大有。<br>【量化】牛市主升浪，收获颇丰。<br>【策略】持有核心资产，防止获利回吐。<br>【生活】运势昌隆，忌满招损。", "outlook": "bullish"},
+    "0,0,1,0,0,0": {"name": "谦", "judgment": "君子有终。", "interp": "【大象】地中有山，谦。<br>【量化】价值低估，底部夯实。<br>【策略】逢低布局，长线持有。<br>【生活】谦虚受益，低调行事。", "outlook": "neutral"},
+    "0,0,0,1,0,0": {"name": "豫", "judgment": "利建侯行师。", "interp": "【大象】雷出地奋，豫。<br>【量化】突破盘整，放量上行。<br>【策略】积极参与，顺势加仓。<br>【生活】安乐愉悦，利于行动。", "outlook": "neutral"},
+    "1,0,0,1,1,0": {"name": "随", "judgment": "元亨利贞。", "interp": "【大象】泽中有雷，随。<br>【量化】趋势跟随，无明显主见。<br>【策略】右侧交易，不摸顶底。<br>【生活】随遇而安，随时变通。", "outlook": "neutral"},
+    "0,1,1,0,0,1": {"name": "蛊", "judgment": "元亨。", "interp": "【大象】山下有风，蛊。<br>【量化】利空出尽，估值修复。<br>【策略】关注困境反转股。<br>【生活】整顿积弊，改革良机。", "outlook": "neutral"},
+    "1,1,0,0,0,0": {"name": "临", "judgment": "元亨利贞。", "interp": "【大象】泽上有地，临。<br>【量化】多头逼空，阳线连发。<br>【策略】果断进场，持有待涨。<br>【生活】居高临下，运势增长。", "outlook": "bullish"},
+    "0,0,0,0,1,1": {"name": "观", "judgment": "盥而不荐。", "interp": "【大象】风行地上，观。<br>【量化】高位滞涨，缩量整理。<br>【策略】多看少动，观察盘面。<br>【生活】冷静观察，静观其变。", "outlook": "neutral"},
+    "1,0,0,1,0,1": {"name": "噬嗑", "judgment": "利用狱。", "interp": "【大象】雷电，噬嗑。<br>【量化】关键阻力位，多空激烈博弈。<br>【策略】需要放量突破，否则回落。<br>【生活】遇到阻碍，需果断解决。", "outlook": "neutral"},
+    "1,0,1,0,0,1": {"name": "贲", "judgment": "小利有攸往。", "interp": "【大象】山下有火，贲。<br>【量化】题材炒作，概念火热但无支撑。<br>【策略】短线快进快出。<br>【生活】表面繁荣，需看清本质。", "outlook": "neutral"},
+    "0,0,0,0,0,1": {"name": "剥", "judgment": "不利有攸往。", "interp": "【大象】山附于地，剥。<br>【量化】高位崩塌，获利盘出逃。<br>【策略】止损离场，不可抄底。<br>【生活】基础不稳，防范损失。", "outlook": "bearish"},
+    "1,0,0,0,0,0": {"name": "复", "judgment": "亨。", "interp": "【大象】雷在地中，复。<br>【量化】超跌反弹，V型反转。<br>【策略】左侧建仓，长线布局。<br>【生活】一阳来复，否极泰来。", "outlook": "bullish"},
+    "1,0,0,1,1,1": {"name": "无妄", "judgment": "元亨利贞。", "interp": "【大象】天下雷行，物与无妄。<br>【量化】回归价值，去除泡沫。<br>【策略】不追题材，关注基本面。<br>【生活】真实无妄，不可投机。", "outlook": "neutral"},
+    "1,1,1,0,0,1": {"name": "大畜", "judgment": "利贞。", "interp": "【大象】天在山中，大畜。<br>【量化】横盘吸筹，主力建仓。<br>【策略】耐心持股，等待主升浪。<br>【生活】积蓄巨大，厚积薄发。", "outlook": "neutral"},
+    "1,0,0,0,0,1": {"name": "颐", "judgment": "贞吉。", "interp": "【大象】山下有雷，颐。<br>【量化】缩量整固，上下两难。<br>【策略】高抛低吸，或休息观望。<br>【生活】颐养身心，此时宜静。", "outlook": "neutral"},
+    "0,1,1,1,1,0": {"name": "大过", "judgment": "栋桡。", "interp": "【大象】泽灭木，大过。<br>【量化】严重超买，乖离率过大。<br>【策略】风险极大，建议清仓。<br>【生活】压力过大，需释放压力。", "outlook": "neutral"},
+    "0,1,0,0,1,0": {"name": "坎", "judgment": "习坎。", "interp": "【大象】水流而不盈，习坎。<br>【量化】破位下行，深不见底。<br>【策略】现金为王，切勿接飞刀。<br>【生活】重重险陷，务必保守。", "outlook": "bearish"},
+    "1,0,1,1,0,1": {"name": "离", "judgment": "利贞。", "interp": "【大象】明两作，离。<br>【量化】加速赶顶，情绪狂热。<br>【策略】短线博弈，快进快出。<br>【生活】如日中天，但来去匆匆。", "outlook": "bullish"},
+    "0,0,1,1,1,0": {"name": "咸", "judgment": "亨。", "interp": "【大象】山上有泽，咸。<br>【量化】消息刺激，脉冲式行情。<br>【策略】关注消息面，灵活操作。<br>【生活】感应沟通，利于社交。", "outlook": "neutral"},
+    "0,1,1,1,0,0": {"name": "恒", "judgment": "亨。", "interp": "【大象】雷风，恒。<br>【量化】趋势稳定，慢牛或阴跌。<br>【策略】顺着当前趋势操作。<br>【生活】恒久持续，保持现状。", "outlook": "neutral"},
+    "0,0,1,1,1,1": {"name": "遁", "judgment": "亨，小利贞。", "interp": "【大象】天下有山，遁。<br>【量化】诱多出货，重心下移。<br>【策略】逢反弹减仓，避险为主。<br>【生活】退避隐遁，不宜争锋。", "outlook": "bearish"},
+    "1,1,1,1,0,0": {"name": "大壮", "judgment": "利贞。", "interp": "【大象】雷在天上，大壮。<br>【量化】放量突破，强势上攻。<br>【策略】重仓持有，防冲高回落。<br>【生活】声势壮大，适合进攻。", "outlook": "bullish"},
+    "0,0,0,1,0,1": {"name": "晋", "judgment": "康侯用锡马。", "interp": "【大象】明出地上，晋。<br>【量化】稳步推升，进二退一。<br>【策略】积极进取，持股待涨。<br>【生活】旭日东升，步步高升。", "outlook": "bullish"},
+    "1,0,1,0,0,0": {"name": "明夷", "judgment": "利艰贞。", "interp": "【大象】明入地中，明夷。<br>【量化】黑天鹅事件，大幅跳水。<br>【策略】空仓避险，不要抱有幻想，韬光养晦。<br>【生活】前景黯淡，需忍耐。", "outlook": "bearish"},
+    "1,0,1,0,1,1": {"name": "家人", "judgment": "利女贞。", "interp": "【大象】风自火出，家人。<br>【量化】防御性板块走强，结构性行情。<br>【策略】关注消费、公用事业。<br>【生活】相亲相爱，基础稳固。", "outlook": "neutral"},
+    "1,1,0,1,0,1": {"name": "睽", "judgment": "小事吉。", "interp": "【大象】上火下泽，睽。<br>【量化】板块分化，赚钱效应差。<br>【策略】多空分歧大，小仓位试错，不宜重仓。<br>【生活】意见不合，小事可为。", "outlook": "neutral"},
+    "0,0,1,0,1,0": {"name": "蹇", "judgment": "利西南。", "interp": "【大象】山上有水，蹇。<br>【量化】上有压力下有支撑，僵持不下。<br>【策略】不宜硬闯，等待变盘。<br>【生活】前有险阻，最好求援。", "outlook": "bearish"},
+    "0,1,0,1,0,0": {"name": "解", "judgment": "利西南。", "interp": "【大象】雷雨作，解。<br>【量化】利空消化，止跌回升。<br>【策略】布局超跌反弹。<br>【生活】冰消瓦解，困难消除。", "outlook": "bullish"},
+    "1,1,0,0,0,1": {"name": "损", "judgment": "有孚，元吉。", "interp": "【大象】山下有泽，损。<br>【量化】缩量阴跌，市值缩水。<br>【策略】止损换股，先失后得。<br>【生活】减损获益，需投入成本。", "outlook": "bearish"},
+    "1,0,0,0,1,1": {"name": "益", "judgment": "利有攸往。", "interp": "【大象】风雷，益。<br>【量化】政策利好，资金流入。<br>【策略】积极参与，大展拳脚。<br>【生活】损上益下，环境宽松。", "outlook": "bullish"},
+    "1,1,1,1,1,0": {"name": "夬", "judgment": "扬于王庭。", "interp": "【大象】泽上于天，夬。<br>【量化】冲关时刻，多头总攻。<br>【策略】必须果断跟进，切勿犹豫。<br>【生活】决断突破，必须果断。", "outlook": "bullish"},
+    "0,1,1,1,1,1": {"name": "姤", "judgment": "女壮，勿用取女。", "interp": "【大象】天下有风，姤。<br>【量化】冲高回落，头部迹象。<br>【策略】虽然上涨但需减仓。<br>【生活】不期而遇，防微杜渐。", "outlook": "bearish"},
+    "0,0,0,1,1,0": {"name": "萃", "judgment": "亨。", "interp": "【大象】泽上于地，萃。<br>【量化】资金抱团，龙头效应。<br>【策略】加入核心资产，享受泡沫。<br>【生活】聚集荟萃，人气高涨。", "outlook": "bullish"},
+    "0,1,1,0,0,0": {"name": "升", "judgment": "元亨。", "interp": "【大象】地中生木，升。<br>【量化】稳步上涨，均线多头。<br>【策略】坚定持仓，不轻易下车。<br>【生活】积小成大，步步高升。", "outlook": "bullish"},
+    "0,1,0,1,1,0": {"name": "困", "judgment": "亨，贞，大人吉。", "interp": "【大象】泽无水，困。<br>【量化】成交低迷，无人问津。<br>【策略】不要轻易抄底，效率极低。<br>【生活】困顿穷乏，需坚守。", "outlook": "neutral"},
+    "0,1,1,0,1,0": {"name": "井", "judgment": "改邑不改井。", "interp": "【大象】木上有水，井。<br>【量化】织布机行情，原地踏步。<br>【策略】适合高股息策略，做定投。<br>【生活】价值仍在，适合定投。", "outlook": "neutral"},
+    "1,0,1,1,1,0": {"name": "革", "judgment": "元亨利贞。", "interp": "【大象】泽中有火，革。<br>【量化】风格切换，新老交替。<br>【策略】调仓换股，跟随新热点。<br>【生活】除旧布新，面临变革。", "outlook": "neutral"},
+    "0,1,1,1,0,1": {"name": "鼎", "judgment": "元吉。", "interp": "【大象】木上有火，鼎。<br>【量化】新周期确立，权重搭台，格局稳定。<br>【策略】布局蓝筹，长线看好。<br>【生活】稳重图新，新的繁荣。", "outlook": "bullish"},
+    "1,0,0,1,0,0": {"name": "震", "judgment": "亨。", "interp": "【大象】洊雷，震。<br>【量化】消息面利空，盘中急跌。<br>【策略】或是黄金坑，注意情绪修复。<br>【生活】突发事件，有惊无险。", "outlook": "neutral"},
+    "0,0,1,0,0,1": {"name": "艮", "judgment": "艮其背。", "interp": "【大象】兼山，艮。<br>【量化】上涨乏力，多重顶。<br>【策略】止盈离场，休息观望。<br>【生活】动静适时，止步不前。", "outlook": "neutral"},
+    "0,0,1,0,1,1": {"name": "渐", "judgment": "女归吉。", "interp": "【大象】山上有木，渐。<br>【量化】碎步上行，慢牛行情。<br>【策略】保持耐心，不要被震荡洗出局。<br>【生活】循序渐进，终成大器。", "outlook": "neutral"},
+    "1,1,0,1,0,0": {"name": "归妹", "judgment": "征凶。", "interp": "【大象】泽上有雷，归妹。<br>【量化】走势怪异，诱多陷阱。<br>【策略】如果不看好，坚决不参与。<br>【生活】错位之象，易失误。", "outlook": "neutral"},
+    "1,0,1,1,0,0": {"name": "丰", "judgment": "亨。", "interp": "【大象】雷电皆至，丰。<br>【量化】成交天量，情绪亢奋。<br>【策略】逐步止盈，落袋为安。<br>【生活】达到顶峰，盛极必衰。", "outlook": "bullish"},
+    "0,0,1,1,0,1": {"name": "旅", "judgment": "小亨。", "interp": "【大象】山上有火，旅。<br>【量化】游资主导，一日游行情。<br>【策略】打板或超短线，快进快出。<br>【生活】漂泊不定，不宜久留。", "outlook": "neutral"},
+    "0,1,1,0,1,1": {"name": "巽", "judgment": "小亨。", "interp": "【大象】随风，巽。<br>【量化】市场形成一致预期，无脑跟随。<br>【策略】不要逆势操作，风往哪吹往哪倒。<br>【生活】顺风而行，顺从时势。", "outlook": "neutral"},
+    "1,1,0,1,1,0": {"name": "兑", "judgment": "亨。", "interp": "【大象】丽泽，兑。<br>【量化】交易活跃，换手率高。<br>【策略】积极参与热点，但防高位被套。<br>【生活】喜悦沟通，防口舌是非。", "outlook": "bullish"},
+    "0,1,0,0,1,1": {"name": "涣", "judgment": "亨。", "interp": "【大象】风行水上，涣。<br>【量化】筹码松动，主力撤退，行情散去。<br>【策略】该跑就跑，不要留恋。<br>【生活】离散之象，人心涣散，凝聚力瓦解。", "outlook": "neutral"},
+    "1,1,0,0,1,0": {"name": "节", "judgment": "亨。", "interp": "【大象】泽上有水，节。<br>【量化】箱体震荡，上有顶下有底。<br>【策略】高抛低吸，懂得止盈。<br>【生活】节制适度，量力而行。", "outlook": "neutral"},
+    "1,1,0,0,1,1": {"name": "中孚", "judgment": "豚鱼吉。", "interp": "【大象】泽上有风，中孚。<br>【量化】技术指标有效，走势规范。<br>【策略】按技术图形操作，相信信号。<br>【生活】诚信感通，脚下有路。", "outlook": "neutral"},
+    "0,0,1,1,0,0": {"name": "小过", "judgment": "亨，利贞。", "interp": "【大象】山上有雷，小过。<br>【量化】小幅波动，大趋势不明。<br>【策略】小仓位试错，不要重仓博弈。<br>【生活】小有过度，宜守。", "outlook": "neutral"},
+    "1,0,1,0,1,0": {"name": "既济", "judgment": "亨，小利贞。", "interp": "【大象】水在火上，既济。<br>【量化】完美收官，利好兑现。<br>【策略】获利了结，见好就收。<br>【生活】大功告成，防盛极而衰。", "outlook": "neutral"},
+    "0,1,0,1,0,1": {"name": "未济", "judgment": "亨。", "interp": "【大象】火在水上，未济。<br>【量化】行情未完，充满变数。<br>【策略】寻找新的增长点，在此博弈。<br>【生活】未完成，充满希望。", "outlook": "neutral"}
+}
+
+
+def key_to_code(key_str):
+    return sum(int(bit) << k for k, bit in enumerate(key_str.split(",")))
+
+
+def code_to_key(code):
+    return ",".join(str((code >> k) & 1) for k in range(N_LINES))
+
+
+# 按编码排列的 64 项表，O(1) 数组下标查询
+HEXAGRAM_TABLE = tuple(HEXAGRAMS[code_to_key(code)] for code in range(64))
+HEXAGRAM_NAMES = np.array([info["name"] for info in HEXAGRAM_TABLE], dtype=object)
+# 动爻数查表 (6 位掩码 -> 1 的个数)
+MOVING_COUNT = np.array([bin(mask).count("1") for mask in range(64)], dtype=np.uint8)
+# 动爻掩码 -> "初·四" 形式的爻位
+POSITION_NAMES = ("初", "二", "三", "四", "五", "上")
+MOVING_LABELS = np.array(
+    ["·".join(POSITION_NAMES[k] for k in range(N_LINES) if mask >> k & 1) for mask in range(64)], dtype=object
+)
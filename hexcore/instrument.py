@@ -0,0 +1,162 @@
+# --- 分阶段计时: span 上下文 / timed 装饰器 / 计数器，导出 JSON Lines 与 Prometheus 文本 ---
+# 默认关闭: 关闭时 span() 返回共享的空对象，timed 只多一次布尔判断
+# 开启方式: HEX_TRACE=1，或设置 HEX_TRACE_FILE (JSON Lines 输出) / HEX_METRICS_PORT (Prometheus 端口)
+import contextvars
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "depth")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        local = self.tracer._local
+        self.depth = getattr(local, "depth", 0)
+        local.depth = self.depth + 1
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter_ns() - self.start
+        self.tracer._local.depth = self.depth
+        self.tracer._finish(self, elapsed, exc_type)
+        return False
+
+
+class Tracer:
+    def __init__(self, enabled=False, path=None):
+        self.enabled = enabled
+        self.path = path
+        self.durations = {}   # 阶段 -> [次数, 累计秒数]
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # 当前这次运行的 span 收集器；放在 contextvar 里，线程池任务可经 carry() 带过去
+        self._spans = contextvars.ContextVar(f"hex_spans_{id(self)}", default=None)
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name, attrs)
+
+    def timed(self, name):
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, name, {}):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def collect(self):
+        # 开始收集当前上下文 (一次 Streamlit 运行) 的 span，返回会被持续追加的列表
+        spans = []
+        self._spans.set(spans)
+        return spans
+
+    def carry(self, fn):
+        # 包装要交给线程池的函数: 工作线程里记录的 span 也进入调用方的收集器
+        if not self.enabled:
+            return fn
+        context = contextvars.copy_context()
+        return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+    def _finish(self, span, elapsed_ns, exc_type):
+        record = {
+            "name": span.name,
+            "ts": time.time() - elapsed_ns / 1e9,
+            "duration_ms": elapsed_ns / 1e6,
+            "depth": span.depth,
+            "thread": threading.current_thread().name,
+        }
+        if span.attrs:
+            record.update(span.attrs)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        with self._lock:
+            stats = self.durations.setdefault(span.name, [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed_ns / 1e9
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        spans = self._spans.get()
+        if spans is not None:
+            spans.append(record)
+
+    def prometheus_text(self):
+        with self._lock:
+            durations = dict(self.durations)
+            counters = dict(self.counters)
+        lines = [
+            "# HELP hex_stage_seconds Time spent per instrumented stage.",
+            "# TYPE hex_stage_seconds summary",
+        ]
+        for name, (n, total) in sorted(durations.items()):
+            lines.append(f'hex_stage_seconds_count{{stage="{name}"}} {n}')
+            lines.append(f'hex_stage_seconds_sum{{stage="{name}"}} {total:.9f}')
+        lines += ["# HELP hex_events_total Instrumented event counters.", "# TYPE hex_events_total counter"]
+        for name, value in sorted(counters.items()):
+            lines.append(f'hex_events_total{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        # 在后台线程提供 /metrics (Prometheus 文本格式)
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = tracer.prometheus_text().encode()
+                self.send_response(200 if self.path in ("/", "/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+TRACER = Tracer(
+    enabled=bool(os.environ.get("HEX_TRACE") == "1" or os.environ.get("HEX_TRACE_FILE") or os.environ.get("HEX_METRICS_PORT")),
+    path=os.environ.get("HEX_TRACE_FILE"),
+)
+span = TRACER.span
+timed = TRACER.timed
+count = TRACER.count
+carry = TRACER.carry
@@ -0,0 +1,280 @@
+# --- 历史卦象日志: 每个品种每根 K 线的本卦/之卦/六爻/解读，导出 Parquet + 静态 HTML ---
+# 逐品种、逐块 (chunk_rows 行) 计算并追加写出，内存只随单块大小增长:
+#   parquet/<symbol>.parquet      每块一个 row group；卦名/卦辞/解读为 64 项字典列
+#   html/hexagrams/<code>.html    64 张卦象卡片，每卦只渲染一次，日志行只放链接
+#   html/<symbol>/<year>.html     按年分页的日志表
+#   journal.json                  已完成的品种 (断点续跑时跳过)
+# 每个品种先写到 .tmp 再整体替换，中途中断不会留下半截文件
+import html
+import json
+import os
+import shutil
+
+import numpy as np
+
+from .cards import CARD_CSS, hexagram_card_html
+from .engine import LOOKBACK_DAYS, VOLATILITY_MULTIPLIER, format_dates, hexagram_arrays
+from .hexagrams import HEXAGRAM_TABLE, MOVING_LABELS, N_LINES
+from .instrument import count, span
+
+CHUNK_ROWS = 50_000
+MANIFEST = "journal.json"
+
+PAGE_CSS = CARD_CSS + """
+body { font-family: 'Noto Serif SC', serif; background: #f8fafc; color: #1e293b; margin: 30px; }
+table { border-collapse: collapse; font-family: 'JetBrains Mono', monospace; font-size: 13px; }
+th, td { padding: 3px 10px; border-bottom: 1px solid #e2e8f0; text-align: right; }
+.grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(260px, 1fr)); gap: 20px; }
+"""
+
+# 日志行里重复出现的单元格按编码预先渲染
+_BEN_CELLS = tuple(f'<td><a href="../hexagrams/{code:02d}.html">{info["name"]}</a></td>' for code, info in enumerate(HEXAGRAM_TABLE))
+_MOVING_CELLS = tuple(f"<td>{label}</td>" for label in MOVING_LABELS)
+# 六爻 (每爻 6-9，2 位) 打包成 12 位整数 -> "初→上" 的爻值串
+_LINE_WEIGHTS = 1 << (2 * np.arange(N_LINES))
+_LINE_CELLS = tuple(
+    "<td>" + " ".join(str(6 + (packed >> (2 * k) & 3)) for k in range(N_LINES)) + "</td>" for packed in range(4 ** N_LINES)
+)
+
+
+def _text(value):
+    return value.replace("<br>", "\n")
+
+
+def _schema():
+    import pyarrow as pa
+
+    text = pa.dictionary(pa.int8(), pa.string())
+    fields = [
+        ("symbol", pa.string()),
+        ("date", pa.timestamp("ns")),
+        ("open", pa.float64()),
+        ("close", pa.float64()),
+        ("change", pa.float64()),
+        ("ben", pa.uint8()),
+        ("zhi", pa.uint8()),
+        ("moving", pa.uint8()),
+        ("ben_name", text),
+        ("zhi_name", text),
+        ("moving_lines", text),
+        ("judgment", text),
+        ("interp", text),
+    ] + [(f"line_{k}", pa.int8()) for k in range(N_LINES)]
+    return pa.schema(fields)
+
+
+def _dictionaries():
+    import pyarrow as pa
+
+    return {
+        "name": pa.array([info["name"] for info in HEXAGRAM_TABLE]),
+        "moving_lines": pa.array(MOVING_LABELS.tolist()),
+        "judgment": pa.array([info["judgment"] for info in HEXAGRAM_TABLE]),
+        "interp": pa.array([_text(info["interp"]) for info in HEXAGRAM_TABLE]),
+    }
+
+
+def iter_chunks(dates, opens, closes, chunk_rows=CHUNK_ROWS, lookback_days=LOOKBACK_DAYS, multiplier=VOLATILITY_MULTIPLIER):
+    # 分块计算卦象序列: 每块往前多带一个取数窗口的 K 线，结果与整段一次计算逐位相同
+    # 产出 (行下标, 结果列) ，只含有效行
+    for lo in range(0, len(dates), chunk_rows):
+        hi = min(lo + chunk_rows, len(dates))
+        ctx = int(np.searchsorted(dates, dates[lo] - np.timedelta64(lookback_days, "D"), side="left"))
+        result = hexagram_arrays(dates[ctx:hi], opens[ctx:hi], closes[ctx:hi], lookback_days, multiplier)
+        result = {name: column[lo - ctx:] for name, column in result.items()}
+        rows = np.flatnonzero(result["valid"])
+        if len(rows):
+            yield rows + lo, {name: column[rows] for name, column in result.items()}
+
+
+def _chunk_table(symbol, dates, opens, closes, rows, result, dicts):
+    import pyarrow as pa
+
+    ben, zhi, moving = result["ben"], result["zhi"], result["moving"]
+    indices = {name: pa.array(codes.astype(np.int8)) for name, codes in (("ben", ben), ("zhi", zhi), ("moving", moving))}
+
+    def text(codes, dictionary):
+        return pa.DictionaryArray.from_arrays(indices[codes], dictionary)
+
+    columns = [
+        pa.array([symbol] * len(rows), pa.string()),
+        pa.array(dates[rows], pa.timestamp("ns")),
+        pa.array(opens[rows]),
+        pa.array(closes[rows]),
+        pa.array((closes[rows] - opens[rows]) / opens[rows]),
+        pa.array(ben, pa.uint8()),
+        pa.array(zhi, pa.uint8()),
+        pa.array(moving, pa.uint8()),
+        text("ben", dicts["name"]),
+        text("zhi", dicts["name"]),
+        text("moving", dicts["moving_lines"]),
+        text("ben", dicts["judgment"]),
+        text("ben", dicts["interp"]),
+    ] + [pa.array(result[f"line_{k}"], pa.int8()) for k in range(N_LINES)]
+    return pa.Table.from_arrays(columns, schema=_schema())
+
+
+def _chunk_rows_html(dates, opens, closes, rows, result):
+    # 逐行拼接一块的 <tr>；卦名 / 动爻 / 爻值单元格都是查表
+    days = format_dates(dates[rows])
+    closes_, changes = closes[rows], (closes[rows] - opens[rows]) / opens[rows]
+    lines = np.stack([result[f"line_{k}"] for k in range(N_LINES)], axis=1).astype(np.int64)
+    packed = ((lines - 6) * _LINE_WEIGHTS).sum(axis=1)
+    return [
+        f"<tr><td>{day}</td><td>{close:.2f}</td><td>{change * 100:+.2f}%</td>"
+        f"{_BEN_CELLS[ben]}{_BEN_CELLS[zhi]}{_MOVING_CELLS[moving]}{_LINE_CELLS[line]}</tr>\n"
+        for day, close, change, ben, zhi, moving, line in zip(
+            days, closes_.tolist(), changes.tolist(), result["ben"].tolist(), result["zhi"].tolist(),
+            result["moving"].tolist(), packed.tolist(),
+        )
+    ]
+
+
+def _page_head(title, css_path):
+    return (
+        f'<!DOCTYPE html><html lang="zh"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+        f'<link rel="stylesheet" href="{css_path}"></head><body><h1>{html.escape(title)}</h1>\n'
+    )
+
+
+def _write_text(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _safe(symbol):
+    return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in symbol)
+
+
+class _YearPages:
+    # 按年份切换输出文件，行按时间顺序追加
+    def __init__(self, directory, symbol):
+        self.directory = directory
+        self.symbol = symbol
+        self.years = []
+        self._file = None
+
+    def write(self, year, rows_html):
+        if not self.years or self.years[-1] != year:
+            self.close()
+            self.years.append(year)
+            self._file = open(os.path.join(self.directory, f"{year}.html"), "w", encoding="utf-8")
+            self._file.write(_page_head(f"{self.symbol} · {year}", "../style.css"))
+            self._file.write(
+                '<p><a href="../index.html">← 全部品种</a></p><table><tr><th>Date</th><th>Close</th><th>Chg%</th>'
+                "<th>本卦</th><th>之卦</th><th>动爻</th><th>六爻 (初→上)</th></tr>\n"
+            )
+        self._file.writelines(rows_html)
+
+    def close(self):
+        if self._file is not None:
+            self._file.write("</table></body></html>\n")
+            self._file.close()
+            self._file = None
+
+
+def write_symbol(out_dir, symbol, dates, opens, closes, chunk_rows=CHUNK_ROWS, lookback_days=LOOKBACK_DAYS,
+                 multiplier=VOLATILITY_MULTIPLIER, write_html=True):
+    import pyarrow.parquet as pq
+
+    safe = _safe(symbol)
+    parquet_path = os.path.join(out_dir, "parquet", f"{safe}.parquet")
+    html_dir = os.path.join(out_dir, "html", safe)
+    tmp_dir = html_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    if write_html:
+        os.makedirs(tmp_dir)
+
+    dicts = _dictionaries()
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    pages = _YearPages(tmp_dir, symbol)
+    total = 0
+    with pq.ParquetWriter(parquet_path + ".tmp", _schema()) as writer:
+        for rows, result in iter_chunks(dates, opens, closes, chunk_rows, lookback_days, multiplier):
+            with span("journal.chunk", symbol=symbol, rows=len(rows)):
+                writer.write_table(_chunk_table(symbol, dates, opens, closes, rows, result, dicts))
+                if write_html:
+                    rows_html = _chunk_rows_html(dates, opens, closes, rows, result)
+                    # 按年份切开这一块
+                    chunk_years = years[rows]
+                    bounds = np.flatnonzero(np.diff(chunk_years)) + 1
+                    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+                        pages.write(int(chunk_years[lo]), rows_html[lo:hi])
+            total += len(rows)
+            count("journal.rows", len(rows))
+    pages.close()
+
+    os.replace(parquet_path + ".tmp", parquet_path)
+    if write_html:
+        shutil.rmtree(html_dir, ignore_errors=True)
+        os.replace(tmp_dir, html_dir)
+    return {"rows": total, "years": pages.years, "parquet": f"parquet/{safe}.parquet", "html": f"html/{safe}"}
+
+
+def _load_manifest(out_dir, params):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"params": params, "symbols": {}}
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["params"] != params:
+        raise ValueError(f"{out_dir} was written with different parameters {manifest['params']}; use a new output directory")
+    return manifest
+
+
+def _write_static(out_dir):
+    # 样式表与 64 张卦象卡片只写一次
+    root = os.path.join(out_dir, "html")
+    os.makedirs(os.path.join(root, "hexagrams"), exist_ok=True)
+    if not os.path.exists(os.path.join(root, "style.css")):
+        _write_text(os.path.join(root, "style.css"), PAGE_CSS)
+    for code, info in enumerate(HEXAGRAM_TABLE):
+        path = os.path.join(root, "hexagrams", f"{code:02d}.html")
+        if not os.path.exists(path):
+            _write_text(path, _page_head(info["name"], "../style.css") + hexagram_card_html(code) + "</body></html>\n")
+
+
+def _write_index(out_dir, manifest):
+    items = "".join(
+        f'<tr><td style="text-align:left;">{html.escape(symbol)}</td><td>{entry["rows"]}</td><td style="text-align:left;">'
+        + " ".join(f'<a href="{entry["html"][5:]}/{year}.html">{year}</a>' for year in entry["years"])
+        + "</td></tr>\n"
+        for symbol, entry in sorted(manifest["symbols"].items())
+    )
+    cards = "".join(
+        f'<a href="hexagrams/{code:02d}.html" style="color:inherit; text-decoration:none;">{hexagram_card_html(code)}</a>'
+        for code in range(64)
+    )
+    _write_text(
+        os.path.join(out_dir, "html", "index.html"),
+        _page_head("卦象日志 (Hexagram Journal)", "style.css")
+        + f"<table><tr><th>Symbol</th><th>Rows</th><th>Years</th></tr>\n{items}</table>"
+        + f'<h2>六十四卦</h2><div class="grid">{cards}</div></body></html>\n',
+    )
+
+
+def write_journal(out_dir, symbols, load, chunk_rows=CHUNK_ROWS, lookback_days=LOOKBACK_DAYS,
+                  multiplier=VOLATILITY_MULTIPLIER, write_html=True):
+    # load(symbol) -> (dates, opens, closes)，按时间升序；每次只持有一个品种的数据
+    # 已在 journal.json 里的品种直接跳过，因此中断后用同样的参数重跑即可续上
+    params = {"lookback_days": lookback_days, "multiplier": multiplier, "html": write_html}
+    os.makedirs(os.path.join(out_dir, "parquet"), exist_ok=True)
+    manifest = _load_manifest(out_dir, params)
+    if write_html:
+        _write_static(out_dir)
+    written = []
+    for symbol in symbols:
+        if symbol in manifest["symbols"]:
+            count("journal.skipped")
+            continue
+        dates, opens, closes = load(symbol)
+        with span("journal.symbol", symbol=symbol):
+            entry = write_symbol(out_dir, symbol, dates, opens, closes, chunk_rows, lookback_days, multiplier, write_html)
+        manifest["symbols"][symbol] = entry
+        _write_text(os.path.join(out_dir, MANIFEST), json.dumps(manifest, ensure_ascii=False, indent=1))
+        if write_html:
+            _write_index(out_dir, manifest)
+        written.append(symbol)
+    return written
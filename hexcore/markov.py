@@ -0,0 +1,113 @@
+# --- 卦象马尔可夫转移模型: 64x64 转移计数，可增量更新、可落盘 ---
+import os
+import threading
+
+import numpy as np
+
+from .engine import LOOKBACK_DAYS, calculate_hexagram_series
+
+HORIZONS = (1, 5)   # 次日 / 下周 (5 个交易日)
+
+
+class TransitionModel:
+    # counts[symbol][i, a, b]: 本卦 a 经过 horizons[i] 根 K 线后变为 b 的次数
+    def __init__(self, horizons=HORIZONS):
+        self.horizons = tuple(horizons)
+        self.counts = {}
+        self.pooled = np.zeros((len(self.horizons), 64, 64), dtype=np.uint32)
+        self._tails = {}      # symbol -> 最近 max(horizons) 个本卦编码
+        self._last_time = {}  # symbol -> 已计入的最后时间 (ns)，避免重复计数
+        self._lock = threading.Lock()
+
+    def extend(self, symbol, times, codes):
+        # 追加一个品种的本卦序列 (按时间升序)；早于已计入时间的部分自动跳过
+        times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+        codes = np.asarray(codes, dtype=np.int64)
+        with self._lock:
+            last = self._last_time.get(symbol)
+            if last is not None:
+                keep = times > last
+                times, codes = times[keep], codes[keep]
+            if len(codes) == 0:
+                return 0
+            counts = self.counts.setdefault(symbol, np.zeros_like(self.pooled))
+            tail = self._tails.get(symbol, np.empty(0, dtype=np.int64))
+            seq = np.concatenate([tail, codes])
+            for i, h in enumerate(self.horizons):
+                # 只统计终点落在新数据上的转移
+                start = max(len(tail), h)
+                if start >= len(seq):
+                    continue
+                src, dst = seq[start - h:len(seq) - h], seq[start:]
+                np.add.at(counts[i], (src, dst), 1)
+                np.add.at(self.pooled[i], (src, dst), 1)
+            self._tails[symbol] = seq[-max(self.horizons):]
+            self._last_time[symbol] = int(times[-1])
+            return len(codes)
+
+    def update(self, symbol, time, code):
+        # 单根 K 线的增量更新 (流式场景)
+        return self.extend(symbol, [np.datetime64(time, 'ns')], [code])
+
+    def last_time(self, symbol):
+        # 该品种已计入的最后一根 K 线时间；未计入过时为 None
+        last = self._last_time.get(symbol)
+        return None if last is None else np.datetime64(last, 'ns')
+
+    def update_from_frame(self, symbol, df, lookback_days=LOOKBACK_DAYS):
+        series = calculate_hexagram_series(df, lookback_days)
+        series = series[series["valid"]]
+        return self.extend(symbol, series.index.values, series["ben"].to_numpy())
+
+    def distribution(self, code, horizon=1, symbol=None):
+        # P(h 根 K 线后的本卦 | 今日本卦 = code)，长度 64；无样本时全为 0
+        counts = self.pooled if symbol is None else self.counts.get(symbol)
+        if counts is None:
+            return np.zeros(64)
+        row = counts[self.horizons.index(horizon), code].astype(float)
+        total = row.sum()
+        return row / total if total else row
+
+    def probabilities(self, horizon=1, symbol=None):
+        counts = self.pooled if symbol is None else self.counts[symbol]
+        mat = counts[self.horizons.index(horizon)].astype(float)
+        totals = mat.sum(axis=1, keepdims=True)
+        return np.divide(mat, totals, out=np.zeros_like(mat), where=totals > 0)
+
+    # --- 持久化 ---
+    def save(self, path):
+        with self._lock:
+            symbols = sorted(self.counts)
+            width = max(self.horizons)
+            tails = np.full((len(symbols), width), -1, dtype=np.int16)
+            for row, symbol in enumerate(symbols):
+                tail = self._tails[symbol]
+                tails[row, width - len(tail):] = tail
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    horizons=np.array(self.horizons),
+                    symbols=np.array(symbols, dtype=str),
+                    counts=np.stack([self.counts[s] for s in symbols]) if symbols else np.zeros((0,) + self.pooled.shape, np.uint32),
+                    tails=tails,
+                    last_time=np.array([self._last_time[s] for s in symbols], dtype=np.int64),
+                )
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, horizons=HORIZONS):
+        if not os.path.exists(path):
+            return cls(horizons)
+        with np.load(path) as data:
+            model = cls(tuple(int(h) for h in data["horizons"]))
+            for row, symbol in enumerate(data["symbols"]):
+                symbol = str(symbol)
+                model.counts[symbol] = data["counts"][row].astype(np.uint32)
+                tail = data["tails"][row]
+                model._tails[symbol] = tail[tail >= 0].astype(np.int64)
+                model._last_time[symbol] = int(data["last_time"][row])
+            if model.counts:
+                model.pooled = np.sum(list(model.counts.values()), axis=0, dtype=np.uint32)
+        return model
@@ -0,0 +1,60 @@
+# --- 行情数据源: 统一接口 fetch(symbol, start, end) -> OHLCV DataFrame ([start, end)) ---
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .instrument import carry
+
+
+class YFinanceProvider:
+    # yf.download 内部使用全局共享状态，多线程并发会互相覆盖结果，
+    # 这里改用 Ticker.history，每个请求相互独立
+    # interval: "1d" 日线；"1h" / "30m" 等分时线 (Yahoo 只提供最近一段时间)
+    def __init__(self, interval="1d"):
+        self.interval = interval
+
+    def fetch(self, symbol, start, end):
+        import yfinance as yf
+
+        df = yf.Ticker(symbol).history(start=start, end=end, interval=self.interval, auto_adjust=True)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        return df
+
+
+class FrameProvider:
+    # 本地替身数据源 (测试/回放): 从内存里的 DataFrame 切片，可模拟网络延迟
+    def __init__(self, frames, latency=0.0):
+        self.frames = frames
+        self.latency = latency
+
+    @classmethod
+    def from_dir(cls, path, latency=0.0):
+        # 目录下每个 <symbol>.csv / <symbol>.parquet 即一个品种
+        frames = {}
+        for file in sorted(glob.glob(os.path.join(path, "*.csv")) + glob.glob(os.path.join(path, "*.parquet"))):
+            symbol, ext = os.path.splitext(os.path.basename(file))
+            if ext == ".parquet":
+                frames[symbol] = pd.read_parquet(file)
+            else:
+                frames[symbol] = pd.read_csv(file, index_col=0, parse_dates=True)
+        return cls(frames, latency)
+
+    def fetch(self, symbol, start, end):
+        if self.latency:
+            time.sleep(self.latency)
+        df = self.frames.get(symbol)
+        if df is None:
+            return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+        return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+
+def fetch_many(store, symbols, start, end, max_workers=8):
+    # 多品种并发取数: 总耗时约等于最慢的一次请求，而不是逐个相加
+    symbols = list(symbols)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+        frames = pool.map(carry(lambda s: store.get(s, start, end)), symbols)
+        return dict(zip(symbols, frames))
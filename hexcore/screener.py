@@ -0,0 +1,73 @@
+# --- 全市场筛选: 整个品种池一次算出当前卦象，按卦名 / 动爻数筛选排序 ---
+# 数据从本地行情仓库批量取成 (品种数 x K 线数) 矩阵，卦象计算是一次二维数组运算
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from .engine import LOOKBACK_DAYS, VOLATILITY_MULTIPLIER, latest_hexagrams
+from .hexagrams import HEXAGRAM_NAMES, HEXAGRAM_TABLE, MOVING_COUNT, MOVING_LABELS, N_LINES
+from .instrument import span, timed
+from .store import COLUMNS
+
+_OPEN, _CLOSE = COLUMNS.index("Open"), COLUMNS.index("Close")
+OUTLOOKS = np.array([info["outlook"] for info in HEXAGRAM_TABLE], dtype=object)
+
+
+def scan_window(date, lookback_days=LOOKBACK_DAYS):
+    # 与单品种视图相同的取数窗口: [基准日 - lookback, 基准日 + 1)
+    end_date = pd.Timestamp(date)
+    return end_date - timedelta(days=lookback_days), end_date + timedelta(days=1)
+
+
+@timed("screener.scan")
+def scan(store, universe, date, lookback_days=LOOKBACK_DAYS, multiplier=VOLATILITY_MULTIPLIER):
+    # universe: {代码: 板块} 或代码列表；只读本地仓库，联网补数请先调用 store.sync_many
+    # 返回每个有效品种一行；K 线不足 6 根的品种不出现在结果里
+    if not isinstance(universe, dict):
+        universe = {symbol: "" for symbol in universe}
+    symbols = list(universe)
+    start, end = scan_window(date, lookback_days)
+    dates, values, counts = store.panel(symbols, start, end)
+    with span("screener.compute", symbols=len(symbols)):
+        opens, closes = values[:, :, _OPEN], values[:, :, _CLOSE]
+        result = latest_hexagrams(opens, closes, counts, multiplier)
+        rows = np.flatnonzero(result["valid"])
+        ben, zhi, moving = result["ben"][rows], result["zhi"][rows], result["moving"][rows]
+        last_open, last_close = opens[rows, -1], closes[rows, -1]
+        table = pd.DataFrame({
+            "symbol": np.array(symbols, dtype=object)[rows],
+            "sector": [universe[symbols[i]] for i in rows],
+            "date": dates[rows, -1],
+            "close": last_close,
+            "change": (last_close - last_open) / last_open,
+            "ben": ben,
+            "ben_name": HEXAGRAM_NAMES[ben],
+            "zhi": zhi,
+            "zhi_name": HEXAGRAM_NAMES[zhi],
+            "moving_count": MOVING_COUNT[moving],
+            "moving_lines": MOVING_LABELS[moving],
+            "outlook": OUTLOOKS[ben],
+        })
+    return table.sort_values(["moving_count", "ben", "symbol"], ascending=[False, True, True], ignore_index=True)
+
+
+def filter_scan(table, ben_names=None, min_moving=0, max_moving=N_LINES, outlooks=None, sectors=None):
+    # 例: filter_scan(table, ben_names=["乾"], min_moving=2) -> 处于乾卦且有 2 个以上动爻的品种
+    mask = table["moving_count"].between(min_moving, max_moving)
+    if ben_names:
+        mask &= table["ben_name"].isin(ben_names)
+    if outlooks:
+        mask &= table["outlook"].isin(outlooks)
+    if sectors:
+        mask &= table["sector"].isin(sectors)
+    return table[mask].reset_index(drop=True)
+
+
+def page(table, number, size=50, sort_by=None, ascending=True):
+    # 先排序再分页 (number 从 1 开始)，返回 (当前页, 总页数)
+    if sort_by:
+        table = table.sort_values(sort_by, ascending=ascending, kind="stable")
+    pages = max(1, -(-len(table) // size))
+    number = min(max(1, number), pages)
+    return table.iloc[(number - 1) * size:number * size], pages
@@ -0,0 +1,259 @@
+# --- 本地行情仓库: 按品种落盘的列式 OHLCV，只补拉缺失区间 ---
+# 布局: <root>/<symbol>/dates.npy (datetime64[ns]) + ohlcv.npy (N x 5 float64)
+#       + meta.json (已覆盖的日期区间，避免节假日空档被反复请求)
+# 用 .npy 而不用 Parquet: 可以直接只读内存映射、按下标切片，不需要整列反序列化
+# (pyarrow 只有卦象日志导出用到)
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .instrument import carry, count, span, timed
+from .providers import YFinanceProvider
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DEFAULT_ROOT = os.environ.get(
+    "HEX_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "hex-store")
+)
+LIVE_TTL = 900  # 当日未收盘数据的重拉间隔 (秒)
+MAX_EMPTY_GAP_DAYS = 7
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).tz_localize(None).normalize(), 'D')
+
+
+def _missing_ranges(covered, start, end):
+    # covered: 已排序且不重叠的 [s, e) 区间；返回 [start, end) 中尚未覆盖的部分
+    gaps = []
+    cursor = start
+    for s, e in covered:
+        if e <= cursor:
+            continue
+        if s >= end:
+            break
+        if s > cursor:
+            gaps.append((cursor, s))
+        cursor = max(cursor, e)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for s, e in sorted(ranges):
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+@timed("store.flatten")
+def _normalize(df):
+    # 统一为 tz-naive 日期索引 + 固定 5 列 float64
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index
+    df = df.reindex(columns=COLUMNS).astype(float)
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+class PriceStore:
+    def __init__(self, root=DEFAULT_ROOT, provider=None, offline=False, live_ttl=LIVE_TTL):
+        self.root = root
+        self.provider = provider or YFinanceProvider()
+        self.offline = offline
+        self.live_ttl = live_ttl
+        self._arrays = {}   # symbol -> (dates, values, meta)，进程内热缓存
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    # --- 磁盘读写 ---
+    def _dir(self, symbol):
+        safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in symbol)
+        return os.path.join(self.root, safe)
+
+    def _lock(self, symbol):
+        with self._guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _read(self, symbol):
+        cached = self._arrays.get(symbol)
+        if cached is not None:
+            return cached
+        path = self._dir(symbol)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            meta["covered"] = [(np.datetime64(s, 'D'), np.datetime64(e, 'D')) for s, e in meta["covered"]]
+            # 只读内存映射: 大仓库只按需调入用到的部分；写入时整体替换文件，不会改到已映射的旧数据
+            dates = np.load(os.path.join(path, "dates.npy"), mmap_mode="r")
+            values = np.load(os.path.join(path, "ohlcv.npy"), mmap_mode="r")
+        else:
+            meta = {"covered": [], "live_fetched_at": 0.0}
+            dates = np.empty(0, dtype='datetime64[ns]')
+            values = np.empty((0, len(COLUMNS)))
+        self._arrays[symbol] = (dates, values, meta)
+        return self._arrays[symbol]
+
+    def _write(self, symbol, frame, meta):
+        path = self._dir(symbol)
+        os.makedirs(path, exist_ok=True)
+        dates = frame.index.values.astype('datetime64[ns]')
+        values = frame.to_numpy(dtype=float)
+        # 先写临时文件再替换，中途中断不会留下半截数据
+        for name, arr in (("dates.npy", dates), ("ohlcv.npy", values)):
+            tmp = os.path.join(path, name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, os.path.join(path, name))
+        disk_meta = dict(meta, symbol=symbol, covered=[(str(s), str(e)) for s, e in meta["covered"]])
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(disk_meta, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+        self._arrays[symbol] = (dates, values, meta)
+
+    def _frame(self, dates, values, lo=0, hi=None):
+        # 复制出来，DataFrame 不引用内存映射的文件
+        return pd.DataFrame(np.array(values[lo:hi]), index=pd.DatetimeIndex(np.array(dates[lo:hi])), columns=COLUMNS)
+
+    # --- 对外接口 ---
+    def load(self, symbol):
+        dates, values, _ = self._read(symbol)
+        return self._frame(dates, values)
+
+    def arrays(self, symbol, cache=True):
+        # 整段历史的原始数组 (dates, N x 5 values)，只读本地，不构造 DataFrame
+        # cache=False: 批量遍历大量品种时不留在进程内缓存，内存只随单个品种增长
+        cached = symbol in self._arrays
+        dates, values, _ = self._read(symbol)
+        if not cache and not cached:
+            self._arrays.pop(symbol, None)
+        return dates, values
+
+    def symbols(self):
+        # 仓库中已有的全部品种 (目录名经过转义，原始代码记录在 meta.json)
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            meta_path = os.path.join(self.root, name, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding="utf-8") as f:
+                    found.append(json.load(f).get("symbol", name))
+        return found
+
+    def sync_many(self, symbols, start, end, max_workers=8):
+        # 多品种并发补齐 [start, end)，不构造 DataFrame；离线模式下什么都不做
+        if self.offline:
+            return
+        start, end = _day(start), _day(end)
+        symbols = list(symbols)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+            list(pool.map(carry(lambda s: self._sync(s, start, end)), symbols))
+
+    def panel(self, symbols, start, end):
+        # 多品种 [start, end) 截面，只读本地 (需要时先 sync_many):
+        #   dates (S, W) / values (S, W, 5) 右对齐，左侧 NaT / NaN 补齐；counts 为每行实际 K 线数
+        with span("store.panel", symbols=len(symbols)):
+            start = _day(start).astype('datetime64[ns]')
+            end = _day(end).astype('datetime64[ns]')
+            slices = []
+            for symbol in symbols:
+                dates, values, _ = self._read(symbol)
+                lo = np.searchsorted(dates, start, side='left')
+                hi = np.searchsorted(dates, end, side='left')
+                slices.append((dates[lo:hi], values[lo:hi]))
+            counts = np.array([len(d) for d, _ in slices], dtype=np.int64)
+            width = int(counts.max()) if len(counts) else 0
+            out_dates = np.full((len(slices), width), np.datetime64('NaT'), dtype='datetime64[ns]')
+            out_values = np.full((len(slices), width, len(COLUMNS)), np.nan)
+            for row, (d, v) in enumerate(slices):
+                if len(d):
+                    out_dates[row, width - len(d):] = d
+                    out_values[row, width - len(d):] = v
+            count("store.rows_served", int(counts.sum()))
+            return out_dates, out_values, counts
+
+    def put(self, symbol, df):
+        # 导入外部数据 (回放文件等)，其日期跨度视为已覆盖
+        new = _normalize(df)
+        covered = None
+        if len(new):
+            covered = (_day(new.index[0]), _day(new.index[-1]) + np.timedelta64(1, 'D'))
+        self._merge(symbol, new, covered)
+
+    def import_file(self, symbol, path):
+        # 回放/离线模式: 从 CSV 或 Parquet 导入历史行情
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+        self.put(symbol, df)
+
+    def get(self, symbol, start, end):
+        # 返回 [start, end) 的日线；只向数据源请求本地没有的区间
+        with span("store.get", symbol=symbol):
+            start, end = _day(start), _day(end)
+            if not self.offline:
+                self._sync(symbol, start, end)
+            dates, values, _ = self._read(symbol)
+            lo = np.searchsorted(dates, start.astype('datetime64[ns]'), side='left')
+            hi = np.searchsorted(dates, end.astype('datetime64[ns]'), side='left')
+            count("store.rows_served", int(hi - lo))
+            return self._frame(dates, values, lo, hi)
+
+    def _merge(self, symbol, new, covered=None, live_fetched_at=None):
+        # 合并新数据 (同日以新数据为准)，并登记本次确认过的 [start, end) 区间
+        with self._lock(symbol):
+            dates, values, meta = self._read(symbol)
+            old = self._frame(dates, values)
+            merged = pd.concat([old[~old.index.isin(new.index)], new]).sort_index() if len(new) else old
+            meta = dict(meta)
+            if covered is not None:
+                meta["covered"] = _merge_ranges(meta["covered"] + [covered])
+            if live_fetched_at is not None:
+                meta["live_fetched_at"] = live_fetched_at
+            # 替换文件前先放开旧文件的映射 (Windows 上仍被映射的文件不能替换)
+            del dates, values
+            self._arrays.pop(symbol, None)
+            self._write(symbol, merged, meta)
+
+    def _sync(self, symbol, start, end):
+        today = _day(datetime.now())
+        with self._lock(symbol):
+            _, _, meta = self._read(symbol)
+            # 今天及以后的数据尚未定型，不记入覆盖区间，按 live_ttl 定期重拉
+            settled_end = min(end, today)
+            gaps = _missing_ranges(meta["covered"], start, settled_end) if start < settled_end else []
+            live = end > today and time.time() - meta.get("live_fetched_at", 0.0) > self.live_ttl
+        for s, e in gaps:
+            count("store.fetch_ranges")
+            with span("provider.fetch", symbol=symbol):
+                raw = self.provider.fetch(symbol, pd.Timestamp(s), pd.Timestamp(e))
+            new = _normalize(raw)
+            # 空结果只对短区间 (周末/假日) 记为已覆盖，长区间多半是请求失败，下次重试
+            trusted = len(new) or (e - s) <= np.timedelta64(MAX_EMPTY_GAP_DAYS, 'D')
+            self._merge(symbol, new, covered=(s, e) if trusted else None)
+        if live:
+            live_start = max(start, today)
+            count("store.live_refresh")
+            with span("provider.fetch", symbol=symbol, live=True):
+                raw = self.provider.fetch(symbol, pd.Timestamp(live_start), pd.Timestamp(end))
+            new = _normalize(raw)
+            self._merge(symbol, new, live_fetched_at=time.time())
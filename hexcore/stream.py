@@ -0,0 +1,138 @@
+# --- 流式卦象引擎: 逐根喂入 K 线，O(1) 增量更新，卦象变化时才输出 ---
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .engine import LOOKBACK_DAYS, VOLATILITY_MULTIPLIER
+from .hexagrams import N_LINES
+
+_RESUM_EVERY = 4096  # 定期精确重算窗口和，消除浮点累积误差
+IDLE_TIMEOUT = 30.0  # UI 超过这么多秒没有读取 (会话已关闭)，后台线程自行退出
+_NS = np.dtype("datetime64[ns]")
+
+
+def _ns(ts):
+    # 时间戳 -> int ns。整数 ns / Timestamp / datetime64[ns] 直接取值，不经 pd.Timestamp 构造；
+    # 其余 (字符串、datetime、其他单位的 datetime64) 交给 pandas 解析
+    if type(ts) is int:
+        return ts
+    if isinstance(ts, pd.Timestamp):
+        return ts.value
+    if isinstance(ts, np.datetime64) and ts.dtype == _NS:
+        return ts.item()
+    if isinstance(ts, np.integer):
+        return int(ts)
+    return pd.Timestamp(ts).value
+
+
+class HexagramStream:
+    # 与批量引擎同一口径: 阈值 = 过去 lookback_days 内 |close-open|/open 的均值 * 1.5，
+    # 六爻取最近 6 根 K 线 (初爻 = 最新)
+    def __init__(self, lookback_days=LOOKBACK_DAYS, multiplier=VOLATILITY_MULTIPLIER):
+        self.span = pd.Timedelta(days=lookback_days).value
+        self.multiplier = multiplier
+        self._window = deque()          # (时间戳 ns, 波动) —— 滚动均值
+        self._sum = 0.0                 # 只累加有限值；NaN/inf 单独计数，否则移出窗口后仍污染 _sum
+        self._bad = 0
+        self._ring = [(False, 0.0)] * N_LINES   # 最近 6 根的 (是否收阳, 波动)
+        self._pos = 0
+        self._seen = 0
+        self._state = None              # 当前 (本卦, 动爻掩码)
+        self.bars = 0
+
+    def update(self, ts, open_, close):
+        # 返回新的卦象事件 dict；卦象未变化 (或不足 6 根) 时返回 None
+        t = _ns(ts)
+        change = abs((close - open_) / open_)
+        self.bars += 1
+
+        self._window.append((t, change))
+        self._add(change, 1)
+        cutoff = t - self.span
+        while self._window[0][0] < cutoff:
+            self._add(self._window.popleft()[1], -1)
+        if self.bars % _RESUM_EVERY == 0:
+            self._sum = sum(c for _, c in self._window if math.isfinite(c))
+
+        self._ring[self._pos] = (close >= open_, change)
+        self._pos = (self._pos + 1) % N_LINES
+        self._seen += 1
+        if self._seen < N_LINES or len(self._window) < N_LINES:
+            return None
+
+        # 与批量引擎一致: 窗口内有 NaN/inf 时均值非有限，该窗口不出动爻
+        threshold = math.nan if self._bad else self._sum / len(self._window) * self.multiplier
+        ben = moving = 0
+        for k in range(N_LINES):
+            up, chg = self._ring[(self._pos - 1 - k) % N_LINES]
+            ben |= up << k
+            moving |= (chg > threshold) << k
+        if (ben, moving) == self._state:
+            return None
+        self._state = (ben, moving)
+        lines = tuple(
+            (9 if (moving >> k) & 1 else 7) if (ben >> k) & 1 else (6 if (moving >> k) & 1 else 8)
+            for k in range(N_LINES)
+        )
+        return {"time": ts, "ben": ben, "zhi": ben ^ moving, "moving": moving, "lines": lines}
+
+    def _add(self, change, sign):
+        if math.isfinite(change):
+            self._sum += sign * change
+        else:
+            self._bad += sign
+
+    def run(self, bars):
+        # bars: 可迭代的 (时间, open, close)，时间可为 int ns / Timestamp / datetime64 / 字符串；逐个产出卦象变化事件
+        for ts, open_, close in bars:
+            event = self.update(ts, open_, close)
+            if event is not None:
+                yield event
+
+
+def iter_bars(df, delay=0.0):
+    # 从 DataFrame / 回放文件生成 (时间, open, close)；delay > 0 时按节奏回放
+    if isinstance(df, str):
+        df = pd.read_parquet(df) if df.endswith(".parquet") else pd.read_csv(df, index_col=0, parse_dates=True)
+    for ts, open_, close in zip(df.index, df['Open'].to_numpy(float), df['Close'].to_numpy(float)):
+        yield ts, float(open_), float(close)
+        if delay:
+            time.sleep(delay)
+
+
+class StreamSubscription:
+    # 后台线程消费行情源，UI 只需定时读取 latest / events，无需重跑整页；
+    # UI 每次读取前调用 touch()，超过 idle_timeout 秒没有 touch 时线程退出
+    def __init__(self, bars, lookback_days=LOOKBACK_DAYS, history=50, idle_timeout=IDLE_TIMEOUT):
+        self.stream = HexagramStream(lookback_days)
+        self.latest = None
+        self.events = deque(maxlen=history)
+        self.done = False
+        self.idle_timeout = idle_timeout
+        self._touched = time.monotonic()
+        self._stop = threading.Event()
+        self._bars = bars
+        self._thread = threading.Thread(target=self._consume, daemon=True)
+        self._thread.start()
+
+    def _consume(self):
+        try:
+            for ts, open_, close in self._bars:
+                if self._stop.is_set() or time.monotonic() - self._touched > self.idle_timeout:
+                    break
+                event = self.stream.update(ts, open_, close)
+                if event is not None:
+                    self.latest = event
+                    self.events.append(event)
+        finally:
+            self.done = True
+
+    def touch(self):
+        self._touched = time.monotonic()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,152 @@
+# --- 参数扫描: 波动阈值倍数 x 取数窗口 x 均值方法，多进程并行 ---
+# 行情数组放在共享内存里，子进程直接映射视图，不需要把价格数据 pickle 给每个 worker
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .backtest import forward_returns
+from .engine import index_dates, lines_to_codes, price_arrays, series_lines, volatility_baseline
+from .hexagrams import MOVING_COUNT, N_LINES
+
+MULTIPLIERS = (1.0, 1.25, 1.5, 1.75, 2.0)
+LOOKBACKS = (20, 40, 60, 90)
+METHODS = ("mean", "median", "ewm")
+HORIZON = 5         # 用于衡量"区分度"的前瞻收益持有期
+MIN_GROUP = 20      # 计算收益极差时，样本太少的卦不参与
+
+_FIELDS = ("dates", "opens", "closes", "fwd")
+_shared = {}        # 子进程内: 字段名 -> 共享内存上的数组视图
+
+
+def _pack(frames, horizon):
+    # 所有品种首尾相接放进一块共享内存: 4 个字段 x N 个 8 字节数
+    parts = {name: [] for name in _FIELDS}
+    bounds, offset = [], 0
+    for df in frames.values():
+        opens, closes = price_arrays(df)
+        parts["dates"].append(index_dates(df).astype(np.int64))
+        parts["opens"].append(opens)
+        parts["closes"].append(closes)
+        parts["fwd"].append(forward_returns(closes, horizon))
+        bounds.append((offset, offset + len(closes)))
+        offset += len(closes)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, offset * 8 * len(_FIELDS)))
+    for i, name in enumerate(_FIELDS):
+        view = np.ndarray(offset, dtype=np.int64 if name == "dates" else float, buffer=shm.buf, offset=i * offset * 8)
+        view[:] = np.concatenate(parts[name]) if offset else []
+    return shm, offset, bounds
+
+
+def _attach(name, length, bounds):
+    # 子进程初始化: 映射共享内存 (只读使用)
+    shm = shared_memory.SharedMemory(name=name)
+    _shared["shm"] = shm
+    _shared["bounds"] = bounds
+    for i, field in enumerate(_FIELDS):
+        dtype = np.int64 if field == "dates" else float
+        _shared[field] = np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=i * length * 8)
+
+
+def _separation(codes, fwd):
+    # 按之卦分组的前瞻收益: 组间方差占比 (eta^2) 与组均值极差
+    # (本卦只取决于涨跌方向，与参数无关；参数通过动爻影响的是之卦)
+    ok = ~np.isnan(fwd)
+    codes, fwd = codes[ok], fwd[ok]
+    if len(fwd) == 0:
+        return np.nan, np.nan
+    n = np.bincount(codes, minlength=64)
+    sums = np.bincount(codes, weights=fwd, minlength=64)
+    means = np.divide(sums, n, out=np.zeros(64), where=n > 0)
+    total = ((fwd - fwd.mean()) ** 2).sum()
+    between = (n * (means - fwd.mean()) ** 2).sum()
+    big = n >= MIN_GROUP
+    spread = means[big].max() - means[big].min() if big.any() else np.nan
+    return (between / total if total else np.nan), spread
+
+
+def _evaluate(task):
+    # 一个 (窗口, 方法) 组合: 窗口统计只算一次，再套用所有倍数
+    lookback, method, multipliers = task
+    per_symbol = []
+    for lo, hi in _shared["bounds"]:
+        dates = _shared["dates"][lo:hi].view('datetime64[ns]')
+        opens, closes = _shared["opens"][lo:hi], _shared["closes"][lo:hi]
+        changes = np.abs((closes - opens) / opens)
+        baseline, counts = volatility_baseline(dates, changes, lookback, method)
+        per_symbol.append((opens, closes, baseline, counts >= N_LINES, _shared["fwd"][lo:hi]))
+
+    rows = []
+    for multiplier in multipliers:
+        bens, movings, fwds = [], [], []
+        for opens, closes, baseline, valid, fwd in per_symbol:
+            ben, moving = lines_to_codes(series_lines(opens, closes, baseline * multiplier, valid))
+            bens.append(ben[valid])
+            movings.append(moving[valid])
+            fwds.append(fwd[valid])
+        ben, moving, fwd = np.concatenate(bens), np.concatenate(movings), np.concatenate(fwds)
+        eta2, spread = _separation((ben ^ moving).astype(np.int64), fwd)
+        rows.append({
+            "multiplier": multiplier,
+            "lookback_days": lookback,
+            "method": method,
+            "samples": len(ben),
+            "moving_freq": MOVING_COUNT[moving].mean() / N_LINES if len(moving) else np.nan,
+            "no_change_rate": (moving == 0).mean() if len(moving) else np.nan,
+            "eta2": eta2,
+            "spread": spread,
+        })
+    return rows
+
+
+def run_sweep(frames, multipliers=MULTIPLIERS, lookbacks=LOOKBACKS, methods=METHODS,
+              horizon=HORIZON, max_workers=None):
+    # frames: {symbol: OHLCV DataFrame}。返回每个参数组合一行，按区分度 eta2 降序
+    frames = {s: df for s, df in frames.items() if df is not None and len(df)}
+    if not frames:
+        raise ValueError("run_sweep needs at least one non-empty frame")
+    tasks = [(lookback, method, tuple(multipliers)) for lookback, method in itertools.product(lookbacks, methods)]
+    shm, length, bounds = _pack(frames, horizon)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 initializer=_attach, initargs=(shm.name, length, bounds)) as pool:
+            rows = [row for result in pool.map(_evaluate, tasks) for row in result]
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(rows).sort_values("eta2", ascending=False, ignore_index=True)
+
+
+def main(argv=None):
+    from .store import PriceStore
+
+    parser = argparse.ArgumentParser(description="卦象模型参数扫描 (阈值倍数 / 取数窗口 / 均值方法)")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--start", default="2000-01-01")
+    parser.add_argument("--end", default=pd.Timestamp.now().normalize() + pd.Timedelta(days=1))
+    parser.add_argument("--multipliers", type=float, nargs="+", default=MULTIPLIERS)
+    parser.add_argument("--lookbacks", type=int, nargs="+", default=LOOKBACKS)
+    parser.add_argument("--methods", nargs="+", default=METHODS, choices=METHODS)
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--offline", action="store_true", help="只用本地行情仓库，不联网")
+    parser.add_argument("--output", help="结果写入 CSV")
+    args = parser.parse_args(argv)
+
+    store = PriceStore(offline=args.offline)
+    frames = {symbol: store.get(symbol, args.start, args.end) for symbol in args.symbols}
+    if not any(len(df) for df in frames.values()):
+        where = "本地行情仓库" if args.offline else "数据源"
+        raise SystemExit(f"{where}中没有 {', '.join(args.symbols)} 在 [{args.start}, {args.end}) 的行情")
+    result = run_sweep(frames, args.multipliers, args.lookbacks, args.methods, args.horizon, args.workers)
+    if args.output:
+        result.to_csv(args.output, index=False)
+    print(result.to_string())
+
+
+if __name__ == "__main__":
+    main()
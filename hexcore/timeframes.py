@@ -0,0 +1,95 @@
+# --- 多周期卦象: 小时 / 日 / 周 / 月 ---
+# 周线、月线由日线仓库重采样，小时线由分钟/小时线重采样；各周期沿用同一模型
+# (窗口 = 往前 40 个周期，阈值 = 窗口平均波动 * 1.5，六爻 = 最后 6 根)
+# 日/周/月线窗口从基准日往前算 (与单品种视图一致)，小时线从最后一根 K 线往前算
+import threading
+
+import pandas as pd
+
+from .engine import VOLATILITY_MULTIPLIER, calculate_hexagram
+from .hexagrams import N_LINES
+from .instrument import count, span, timed
+
+# rule 为 None 表示直接使用基础 K 线；所有周期按左闭区间、以周期起点为标签
+TIMEFRAMES = {
+    "1h": {"label": "小时线 (1H)", "base": "intraday", "rule": "1h", "lookback": pd.DateOffset(hours=40)},
+    "1d": {"label": "日线 (1D)", "base": "daily", "rule": None, "lookback": pd.DateOffset(days=40)},
+    "1wk": {"label": "周线 (1W)", "base": "daily", "rule": "W-MON", "lookback": pd.DateOffset(weeks=40)},
+    "1mo": {"label": "月线 (1M)", "base": "daily", "rule": "MS", "lookback": pd.DateOffset(months=40)},
+}
+_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def history_start(timeframe, date):
+    # 计算某周期卦象所需基础 K 线的起始日期 (窗口 + 当前周期)
+    spec = TIMEFRAMES[timeframe]
+    start = pd.Timestamp(date) - spec["lookback"]
+    return start.to_period("M").start_time if spec["rule"] == "MS" else start - pd.Timedelta(days=7)
+
+
+@timed("timeframe.resample")
+def resample_ohlc(df, rule):
+    if rule is None:
+        return df
+    return df.resample(rule, closed="left", label="left").agg(_AGG).dropna(subset=["Open"])
+
+
+class ResampleCache:
+    # 每个 (key, rule) 缓存一份重采样结果。新的基础 K 线到来时，
+    # 只从缓存中最后一个 (可能未走完的) 周期开始重算，之前的周期原样复用
+    def __init__(self):
+        self._entries = {}  # (key, rule) -> (first_ts, last_ts, last_row, frame)
+        self._lock = threading.Lock()
+
+    def resample(self, key, base, rule):
+        if rule is None or len(base) == 0:
+            return base
+        with self._lock:
+            entry = self._entries.get((key, rule))
+            if entry is not None:
+                first_ts, last_ts, last_row, frame = entry
+                covers = first_ts <= base.index[0] <= frame.index[-1]
+                unchanged = base.index[-1] == last_ts and base.iloc[-1].equals(last_row)
+                if covers and (base.index[-1] < last_ts or unchanged):
+                    # 无新 K 线 (或基准日更早，由 as_of 截断)
+                    count("timeframe.cache_hit")
+                    return frame
+                if covers:
+                    # 增量: 重算最后一个周期及之后
+                    count("timeframe.incremental")
+                    tail = resample_ohlc(base[base.index >= frame.index[-1]], rule)
+                    frame = pd.concat([frame.iloc[:-1], tail])
+                    self._entries[(key, rule)] = (first_ts, base.index[-1], base.iloc[-1], frame)
+                    return frame
+            count("timeframe.full")
+            frame = resample_ohlc(base, rule)
+            self._entries[(key, rule)] = (base.index[0], base.index[-1], base.iloc[-1], frame)
+            return frame
+
+
+def as_of(frame, base, rule, end):
+    # 截至 end (不含) 的周期序列；end 落在某个周期中间时，该周期只用 end 之前的基础 K 线重算，避免未来数据
+    frame = frame[frame.index < end]
+    if rule is None or len(frame) == 0:
+        return frame
+    partial = base[(base.index >= frame.index[-1]) & (base.index < end)]
+    return pd.concat([frame.iloc[:-1], resample_ohlc(partial, rule)])
+
+
+def timeframe_hexagram(cache, key, base, timeframe, date, multiplier=VOLATILITY_MULTIPLIER):
+    # 返回 (本卦编码, 之卦编码, 六爻明细) 与最后一根周期 K 线的起点；数据不足时为 (None, None)
+    spec = TIMEFRAMES[timeframe]
+    with span("timeframe.hexagram", timeframe=timeframe):
+        date = pd.Timestamp(date).normalize()
+        end = date + pd.Timedelta(days=1)
+        if base is None or len(base) == 0:
+            return None, None
+        frame = as_of(cache.resample(key, base, spec["rule"]), base, spec["rule"], end)
+        if len(frame) == 0:
+            return None, None
+        # end 是基准日次日零点，小时线若仍从基准日零点往前算，窗口会多出当天最多 24 根
+        anchor = frame.index[-1] if spec["base"] == "intraday" else date
+        window = frame[frame.index >= anchor - spec["lookback"]]
+        if len(window) < N_LINES:
+            return None, None
+        return calculate_hexagram(window, multiplier), window.index[-1]
@@ -0,0 +1,86 @@
+# --- 筛选池: 能源 / 金属 / 农产品期货 + 相关股票与 ETF (Yahoo Finance 代码) ---
+# 自定义池: 文本或 CSV 文件，每行 "代码[,板块]"，# 开头为注释
+import os
+
+UNIVERSE = {
+    "能源期货": [
+        "CL=F", "BZ=F", "NG=F", "HO=F", "RB=F", "TTF=F", "MTF=F", "QM=F", "QG=F",
+    ],
+    "金属期货": [
+        "GC=F", "SI=F", "HG=F", "PL=F", "PA=F", "ALI=F", "MGC=F", "SIL=F",
+    ],
+    "农产品期货": [
+        "ZC=F", "ZW=F", "KE=F", "ZS=F", "ZM=F", "ZL=F", "ZO=F", "ZR=F",
+        "LE=F", "HE=F", "GF=F", "DC=F", "CC=F", "KC=F", "SB=F", "CT=F", "OJ=F", "LBS=F",
+    ],
+    "油气上游": [
+        "XOM", "CVX", "COP", "EOG", "OXY", "DVN", "FANG", "APA", "CTRA", "EQT",
+        "AR", "RRC", "EXE", "CNX", "OVV", "PR", "MTDR", "CHRD", "SM", "MGY",
+        "CIVI", "NOG", "CRGY", "TALO", "KOS", "VTLE", "GPOR", "CRK", "TPL", "BSM",
+    ],
+    "国际油企": [
+        "SHEL", "BP", "TTE", "EQNR", "E", "PBR", "SU", "CNQ", "CVE", "IMO",
+        "EC", "YPF", "WDS", "VIST", "TRP", "ENB",
+    ],
+    "油服": [
+        "SLB", "HAL", "BKR", "NOV", "FTI", "HP", "PTEN", "NBR", "WHD", "CHX",
+        "LBRT", "PUMP", "RES", "OII", "TDW", "VAL", "RIG", "NE", "WFRD", "AROC",
+    ],
+    "炼化与中游": [
+        "MPC", "VLO", "PSX", "DINO", "PBF", "DK", "CVI", "PARR", "KMI", "WMB",
+        "OKE", "ET", "EPD", "TRGP", "LNG", "MPLX", "PAA", "WES", "DTM", "AM",
+        "ENLC", "KNTK", "NFE", "EE",
+    ],
+    "煤炭与铀": [
+        "BTU", "ARCH", "AMR", "HCC", "CEIX", "ARLP", "NRP", "CCJ", "UEC", "NXE",
+        "DNN", "UUUU", "LEU",
+    ],
+    "金属矿业": [
+        "NEM", "GOLD", "AEM", "FNV", "WPM", "KGC", "AU", "GFI", "RGLD", "AGI",
+        "PAAS", "HL", "CDE", "AG", "FCX", "SCCO", "TECK", "RIO", "BHP", "VALE",
+        "AA", "CENX", "KALU", "MP", "ALB", "SQM", "LAC", "SBSW", "HBM", "ERO",
+    ],
+    "钢铁": [
+        "NUE", "STLD", "CLF", "X", "CMC", "RS", "MT", "TX", "GGB",
+    ],
+    "农业与化肥": [
+        "ADM", "BG", "CTVA", "MOS", "NTR", "CF", "FMC", "ICL", "IPI", "DE",
+        "AGCO", "CNH", "TSN", "PPC", "CALM", "INGR", "DAR", "ANDE", "LW", "SMG",
+    ],
+    "新能源": [
+        "NEE", "ENPH", "SEDG", "FSLR", "RUN", "PLUG", "BE", "ARRY", "SHLS", "CSIQ",
+    ],
+    "商品 ETF": [
+        "XLE", "XOP", "OIH", "VDE", "USO", "BNO", "UNG", "UGA", "GLD", "IAU",
+        "SLV", "GDX", "GDXJ", "SIL", "COPX", "CPER", "PPLT", "PALL", "URA", "DBA",
+        "DBC", "GSG", "PDBC", "CORN", "WEAT", "SOYB", "CANE", "MOO", "LIT", "ICLN",
+    ],
+}
+
+
+def universe_symbols(sectors=None):
+    # {代码: 板块}，sectors 为 None 时取全部板块
+    return {
+        symbol: sector
+        for sector, symbols in UNIVERSE.items()
+        if sectors is None or sector in sectors
+        for symbol in symbols
+    }
+
+
+def load_universe(path, default_sector="自定义"):
+    universe = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            symbol, _, sector = (part.strip() for part in line.partition(","))
+            universe[symbol] = sector or default_sector
+    return universe
+
+
+def default_universe():
+    # HEX_UNIVERSE_FILE 指向自定义池文件时用它，否则用内置池
+    path = os.environ.get("HEX_UNIVERSE_FILE")
+    return load_universe(path) if path else universe_symbols()
@@ -0,0 +1,32 @@
+# --- 测试公用: 合成行情 ---
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_bars(n, seed=0, nan_rows=(), start="2015-01-01"):
+    # 工作日行情，随机剔除约 5% 的日子模拟节假日空档；nan_rows 行的开收盘置为 NaN (数据源缺口)
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=int(n * 1.06))
+    index = index[np.sort(rng.choice(len(index), n, replace=False))]
+    closes = 70 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    opens = closes * (1 + rng.normal(0, 0.015, n))
+    df = pd.DataFrame({
+        "Open": opens,
+        "High": np.maximum(opens, closes) * 1.005,
+        "Low": np.minimum(opens, closes) * 0.995,
+        "Close": closes,
+        "Volume": rng.integers(1_000, 100_000, n).astype(float),
+    }, index=index)
+    df.iloc[list(nan_rows), [0, 3]] = np.nan
+    return df
+
+
+@pytest.fixture
+def bars():
+    return make_bars
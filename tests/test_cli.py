@@ -0,0 +1,33 @@
+# --- 命令行: CSV 读取 (含 yfinance 多层表头) ---
+import numpy as np
+import pandas as pd
+import pytest
+
+from hexcore.cli import read_ohlcv
+
+
+def yfinance_csv(df, path, tickers=("BZ=F",)):
+    # yf.download(...).to_csv() 的格式: Price / Ticker / Date 三行表头
+    columns = pd.MultiIndex.from_product([["Close", "High", "Low", "Open", "Volume"], list(tickers)], names=["Price", "Ticker"])
+    wide = pd.DataFrame({col: df[col[0]] for col in columns}, index=df.index)
+    wide.columns = columns
+    wide.index.name = "Date"
+    wide.to_csv(path)
+
+
+def test_yfinance_multi_header_matches_flat_csv(bars, tmp_path):
+    df = bars(200, 1)
+    df.index.name = "Date"
+    df.to_csv(tmp_path / "flat.csv")
+    yfinance_csv(df, tmp_path / "yf.csv")
+    assert open(tmp_path / "yf.csv").readline().startswith("Price,")
+    flat, multi = read_ohlcv(str(tmp_path / "flat.csv")), read_ohlcv(str(tmp_path / "yf.csv"))
+    assert len(flat[0]) == 200
+    for a, b in zip(flat, multi):
+        assert np.array_equal(a, b)
+
+
+def test_multi_ticker_csv_is_rejected(bars, tmp_path):
+    yfinance_csv(bars(50, 2), tmp_path / "two.csv", tickers=("BZ=F", "NG=F"))
+    with pytest.raises(ValueError):
+        read_ohlcv(str(tmp_path / "two.csv"))
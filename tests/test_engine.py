@@ -0,0 +1,102 @@
+# --- 全历史引擎与原单日模型的逐根一致性 ---
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from hexcore.engine import (
+    LOOKBACK_DAYS, calculate_hexagram, calculate_hexagram_batch, calculate_hexagram_series, latest_hexagrams,
+)
+from hexcore.hexagrams import N_LINES
+
+
+def original_hexagram(df):
+    # 原 app.py 的单日模型 (逐行 iloc)，返回 (本卦爻串, 之卦爻串, 明细)，作为对照基准
+    closes = df['Close'].values.flatten()
+    opens = df['Open'].values.flatten()
+    changes = abs((closes - opens) / opens)
+    volatility_threshold = changes.mean() * 1.5
+
+    ben_lines, zhi_lines, details = [], [], []
+    subset = df.tail(6).iloc[::-1]
+    for i in range(6):
+        row = subset.iloc[i]
+        c = float(row['Close'])
+        o = float(row['Open'])
+        is_moving = abs((c - o) / o) > volatility_threshold
+        if c >= o:
+            line_val = 9 if is_moving else 7
+        else:
+            line_val = 6 if is_moving else 8
+        ben_val = 1 if line_val in [7, 9] else 0
+        zhi_val = 0 if line_val == 9 else (1 if line_val == 6 else ben_val)
+        ben_lines.append(str(ben_val))
+        zhi_lines.append(str(zhi_val))
+        details.append({
+            "date": row.name.strftime('%Y-%m-%d'),
+            "close": c,
+            "change": (c - o) / o,
+            "type": line_val,
+            "position": i,
+        })
+    return ",".join(ben_lines), ",".join(zhi_lines), details
+
+
+def lines_to_code(lines):
+    # "1,0,..." (第 i 位 = 第 i 爻，初爻在前) -> 6 位编码
+    return sum(int(bit) << k for k, bit in enumerate(lines.split(",")))
+
+
+def as_of_window(df, date):
+    # 市场页的取数窗口: [基准日 - 40 天, 基准日 + 1 天)
+    return df[(df.index >= date - timedelta(days=LOOKBACK_DAYS)) & (df.index < date + timedelta(days=1))]
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_series_matches_original_for_every_bar(bars, seed):
+    df = bars(1500, seed)
+    series = calculate_hexagram_series(df)
+    checked = 0
+    for date, row in series.iterrows():
+        window = as_of_window(df, date)
+        assert row["valid"] == (len(window) >= N_LINES)
+        if not row["valid"]:
+            continue
+        ben, zhi, details = original_hexagram(window)
+        assert row["ben"] == lines_to_code(ben)
+        assert row["zhi"] == lines_to_code(zhi)
+        assert [row[f"line_{k}"] for k in range(N_LINES)] == [d["type"] for d in details]
+        checked += 1
+    assert checked > 1400
+
+
+def test_calculate_hexagram_matches_original(bars):
+    df = bars(400, 3)
+    for date in df.index[10::37]:
+        window = as_of_window(df, date)
+        ben, zhi, details = original_hexagram(window)
+        assert calculate_hexagram(window) == (lines_to_code(ben), lines_to_code(zhi), details)
+
+
+def test_latest_hexagrams_matches_batch(bars):
+    # 右对齐矩阵 (截面筛选的输入) 与逐品种 calculate_hexagram_batch 相同；不足 6 根的行无效
+    frames = {f"S{i}": bars(60, i).iloc[-(3 + 7 * i):] for i in range(8)}
+    width = max(len(df) for df in frames.values())
+    opens, closes = np.full((len(frames), width), np.nan), np.full((len(frames), width), np.nan)
+    for row, df in enumerate(frames.values()):
+        opens[row, width - len(df):] = df["Open"]
+        closes[row, width - len(df):] = df["Close"]
+    result = latest_hexagrams(opens, closes, [len(df) for df in frames.values()])
+    for row, (symbol, expected) in enumerate(calculate_hexagram_batch(frames).items()):
+        assert result["valid"][row] == (expected is not None)
+        if expected is not None:
+            assert (result["ben"][row], result["zhi"][row]) == expected[:2]
+
+
+@pytest.mark.parametrize("multiplier", [0.5, 3.0])
+def test_multiplier_is_passed_through(bars, multiplier):
+    df = bars(300, 4)
+    series = calculate_hexagram_series(df, multiplier=multiplier)
+    for date in df.index[20::41]:
+        ben, zhi, _ = calculate_hexagram(as_of_window(df, date), multiplier)
+        assert (ben, zhi) == (series.at[date, "ben"], series.at[date, "zhi"])
@@ -0,0 +1,36 @@
+# --- 分阶段计时: 线程池任务里的 span 也进入调用方的收集器 ---
+from concurrent.futures import ThreadPoolExecutor
+
+from hexcore.instrument import Tracer
+
+
+def test_carry_collects_worker_spans():
+    tracer = Tracer(enabled=True)
+    spans = tracer.collect()
+
+    def work(n):
+        with tracer.span("worker", n=n):
+            return n
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(tracer.carry(work), range(8))) == list(range(8))
+        list(pool.map(work, range(3)))   # 不经 carry 的任务不进收集器
+    assert sorted(s["n"] for s in spans) == list(range(8))
+    assert tracer.durations["worker"][0] == 11
+
+
+def test_collect_starts_a_new_list():
+    tracer = Tracer(enabled=True)
+    first = tracer.collect()
+    with tracer.span("a"):
+        pass
+    second = tracer.collect()
+    with tracer.span("b"):
+        pass
+    assert [s["name"] for s in first] == ["a"] and [s["name"] for s in second] == ["b"]
+
+
+def test_carry_is_identity_when_disabled():
+    tracer = Tracer()
+    fn = len
+    assert tracer.carry(fn) is fn
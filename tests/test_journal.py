@@ -0,0 +1,44 @@
+# --- 卦象日志: 分块导出与不分块、与全历史引擎逐行一致；续跑参数不一致时报错 ---
+import numpy as np
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from hexcore.engine import calculate_hexagram_series, index_dates, price_arrays
+from hexcore.journal import write_journal
+
+
+def read_journal(out_dir, symbol):
+    return pq.read_table(str(out_dir / "parquet" / f"{symbol}.parquet")).to_pandas()
+
+
+def test_chunked_matches_unchunked(bars, tmp_path):
+    frames = {"A": bars(900, 1), "B": bars(300, 2)}
+
+    def load(symbol):
+        opens, closes = price_arrays(frames[symbol])
+        return index_dates(frames[symbol]), opens, closes
+
+    write_journal(str(tmp_path / "small"), frames, load, chunk_rows=37, write_html=False)
+    write_journal(str(tmp_path / "whole"), frames, load, chunk_rows=10 ** 6, write_html=False)
+    for symbol, df in frames.items():
+        small, whole = read_journal(tmp_path / "small", symbol), read_journal(tmp_path / "whole", symbol)
+        assert small.equals(whole)
+        series = calculate_hexagram_series(df)
+        series = series[series["valid"]]
+        assert (small["date"].to_numpy() == series.index.values).all()
+        for column in ["ben", "zhi", "moving"] + [f"line_{k}" for k in range(6)]:
+            assert np.array_equal(small[column].to_numpy(), series[column].to_numpy())
+
+
+def test_resume_skips_done_and_rejects_other_params(bars, tmp_path):
+    df = bars(200, 4)
+
+    def load(symbol):
+        opens, closes = price_arrays(df)
+        return index_dates(df), opens, closes
+
+    assert write_journal(str(tmp_path), ["A"], load, write_html=False) == ["A"]
+    assert write_journal(str(tmp_path), ["A", "B"], load, write_html=False) == ["B"]
+    with pytest.raises(ValueError):
+        write_journal(str(tmp_path), ["C"], load, multiplier=2.0, write_html=False)
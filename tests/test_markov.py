@@ -0,0 +1,38 @@
+# --- 转移模型: 增量更新 / 落盘续算 与一次性全量建模一致 ---
+import numpy as np
+
+from hexcore.engine import calculate_hexagram_series
+from hexcore.markov import TransitionModel
+
+
+def test_incremental_matches_bulk(bars, tmp_path):
+    df = bars(1200, 5)
+    bulk = TransitionModel()
+    bulk.update_from_frame("X", df)
+
+    # 与 app 相同: 每次传入不断变长的历史，已计入的部分自动跳过；中途落盘再载入
+    model = TransitionModel()
+    for end in (200, 201, 650):
+        model.update_from_frame("X", df.iloc[:end])
+    model.save(str(tmp_path / "markov.npz"))
+    model = TransitionModel.load(str(tmp_path / "markov.npz"))
+    assert model.update_from_frame("X", df.iloc[:650]) == 0
+    model.update_from_frame("X", df)
+
+    assert (model.counts["X"] == bulk.counts["X"]).all()
+    assert (model.pooled == bulk.pooled).all()
+    assert model.last_time("X") == np.datetime64(df.index[-1], "ns")
+
+
+def test_stream_updates_match_bulk(bars):
+    df = bars(500, 6)
+    series = calculate_hexagram_series(df)
+    series = series[series["valid"]]
+    bulk = TransitionModel()
+    bulk.extend("X", series.index.values, series["ben"].to_numpy())
+    model = TransitionModel()
+    for time, code in zip(series.index, series["ben"]):
+        model.update("X", time, int(code))
+    assert (model.counts["X"] == bulk.counts["X"]).all()
+    # 每个转移计数一次: 总数 = 序列长度 - 步长
+    assert [int(c.sum()) for c in bulk.counts["X"]] == [len(series) - h for h in bulk.horizons]
@@ -0,0 +1,22 @@
+# --- 全市场筛选与逐品种批量计算一致 ---
+from hexcore.engine import calculate_hexagram_batch
+from hexcore.providers import FrameProvider
+from hexcore.screener import scan, scan_window
+from hexcore.store import PriceStore
+
+
+def test_scan_matches_batch(bars, tmp_path):
+    # 各品种历史长短不一，有的在基准日窗口内不足 6 根
+    frames = {f"S{i}": bars(80 + 40 * i, i).iloc[-(60 + 40 * i):] for i in range(6)}
+    frames["SHORT"] = bars(80, 99).iloc[-4:]
+    date = max(df.index[-1] for df in frames.values())
+    store = PriceStore(str(tmp_path), FrameProvider(frames))
+    start, end = scan_window(date)
+    store.sync_many(frames, start, end)
+
+    table = scan(store, list(frames), date).set_index("symbol")
+    expected = calculate_hexagram_batch({s: store.get(s, start, end) for s in frames})
+    assert set(table.index) == {s for s, result in expected.items() if result is not None}
+    for symbol, row in table.iterrows():
+        ben, zhi, _ = expected[symbol]
+        assert (row["ben"], row["zhi"]) == (ben, zhi)
@@ -0,0 +1,48 @@
+# --- 本地行情仓库: 只补拉缺失区间、文件导入、内存映射读取 ---
+import numpy as np
+import pandas as pd
+
+from hexcore.cli import main
+from hexcore.providers import FrameProvider
+from hexcore.store import PriceStore
+
+
+class CountingProvider(FrameProvider):
+    def __init__(self, frames):
+        super().__init__(frames)
+        self.calls = []
+
+    def fetch(self, symbol, start, end):
+        self.calls.append((start, end))
+        return super().fetch(symbol, start, end)
+
+
+def test_get_fetches_only_missing_ranges(bars, tmp_path):
+    df = bars(600, 1)
+    provider = CountingProvider({"X": df})
+    store = PriceStore(str(tmp_path), provider)
+    first = store.get("X", "2015-03-01", "2015-09-01")
+    assert len(provider.calls) == 1
+    assert store.get("X", "2015-04-01", "2015-08-01").equals(first[(first.index >= "2015-04-01") & (first.index < "2015-08-01")])
+    assert len(provider.calls) == 1
+    both = store.get("X", "2015-01-01", "2015-12-01")
+    assert [(str(s.date()), str(e.date())) for s, e in provider.calls[1:]] == [("2015-01-01", "2015-03-01"), ("2015-09-01", "2015-12-01")]
+    expected = df[(df.index >= "2015-01-01") & (df.index < "2015-12-01")]
+    assert np.array_equal(both.to_numpy(), expected.to_numpy()) and both.index.equals(expected.index)
+
+    # 新实例从磁盘读取 (只读内存映射)，离线模式不再请求数据源
+    reopened = PriceStore(str(tmp_path), provider, offline=True)
+    assert isinstance(reopened.arrays("X")[1], np.memmap)
+    assert reopened.get("X", "2015-01-01", "2015-12-01").equals(both)
+    assert len(provider.calls) == 3
+
+
+def test_import_command_seeds_offline_store(bars, tmp_path, capsys):
+    df = bars(120, 2)
+    df.index.name = "Date"
+    df.to_csv(tmp_path / "BZ=F.csv")
+    main(["import", str(tmp_path / "BZ=F.csv"), "--store", str(tmp_path / "store")])
+    assert "BZ=F: 120" in capsys.readouterr().out
+    store = PriceStore(str(tmp_path / "store"), offline=True)
+    got = store.get("BZ=F", df.index[0], df.index[-1] + pd.Timedelta(days=1))
+    assert np.allclose(got.to_numpy(), df.to_numpy()) and got.index.equals(df.index)
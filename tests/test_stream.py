@@ -0,0 +1,55 @@
+# --- 流式引擎与批量引擎 (calculate_hexagram_series) 的逐根一致性 ---
+import numpy as np
+import pandas as pd
+import pytest
+
+from hexcore.engine import calculate_hexagram_series
+from hexcore.stream import HexagramStream
+
+
+def batch_events(df):
+    # 批量结果中卦象 (本卦, 动爻) 发生变化的行，即流式引擎应当输出事件的位置
+    series = calculate_hexagram_series(df)
+    series = series[series["valid"]]
+    state = list(zip(series["ben"], series["moving"]))
+    return [
+        (series.index[i], int(ben), int(moving))
+        for i, (ben, moving) in enumerate(state)
+        if i == 0 or state[i - 1] != (ben, moving)
+    ]
+
+
+def stream_events(df):
+    stream = HexagramStream()
+    bars = zip(df.index, df["Open"].to_numpy(float), df["Close"].to_numpy(float))
+    return [(pd.Timestamp(e["time"]), e["ben"], e["moving"]) for e in stream.run(bars)]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_stream_matches_batch(bars, seed):
+    df = bars(2000, seed)
+    assert stream_events(df) == batch_events(df)
+
+
+@pytest.mark.parametrize("nan_rows", [(500,), (3, 700, 701, 1999), tuple(range(900, 930))])
+def test_stream_matches_batch_with_nan_bars(bars, nan_rows):
+    df = bars(2000, 7, nan_rows)
+    assert stream_events(df) == batch_events(df)
+
+
+def test_stream_events_carry_lines(bars):
+    df = bars(300, 3)
+    for event in HexagramStream().run(zip(df.index, df["Open"], df["Close"])):
+        lines = np.array(event["lines"])
+        assert event["ben"] == int(((lines & 1) << np.arange(6)).sum())
+        assert event["zhi"] == event["ben"] ^ event["moving"]
+
+
+def test_stream_accepts_int_ns_and_datetime64(bars):
+    df = bars(1000, 4)
+    expected = stream_events(df)
+    ns = df.index.as_unit("ns")
+    for index in (ns.asi8.tolist(), list(ns.values), list(df.index.values)):
+        stream = HexagramStream()
+        bars_ = zip(index, df["Open"].to_numpy(float), df["Close"].to_numpy(float))
+        assert [(pd.Timestamp(e["time"]), e["ben"], e["moving"]) for e in stream.run(bars_)] == expected
@@ -0,0 +1,15 @@
+# --- 参数扫描: 空输入给出明确错误，而不是在工作进程里崩溃 ---
+import pytest
+
+from hexcore.sweep import run_sweep
+
+
+def test_run_sweep_rejects_empty_frames(bars):
+    with pytest.raises(ValueError):
+        run_sweep({"A": bars(0), "B": None})
+
+
+def test_run_sweep_skips_empty_symbols(bars):
+    result = run_sweep({"A": bars(400, 1), "B": bars(0)}, multipliers=(1.5,), lookbacks=(40,), methods=("mean",),
+                       max_workers=1)
+    assert len(result) == 1 and result.loc[0, "samples"] > 0
@@ -0,0 +1,73 @@
+# --- 多周期: 增量重采样与全量一致，as_of 不用到基准日之后的数据 ---
+import pandas as pd
+import pytest
+
+from hexcore.instrument import TRACER
+from hexcore.timeframes import TIMEFRAMES, ResampleCache, as_of, resample_ohlc, timeframe_hexagram
+
+RULES = ["W-MON", "MS"]
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    monkeypatch.setattr(TRACER, "enabled", True)
+    monkeypatch.setattr(TRACER, "counters", {})
+    return TRACER.counters
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_growing_base_matches_full_resample(bars, counters, rule):
+    base = bars(700, 1)
+    cache = ResampleCache()
+    for n in (300, 301, 330, 520, 700):
+        frame = cache.resample("X", base.iloc[:n], rule)
+        pd.testing.assert_frame_equal(frame, resample_ohlc(base.iloc[:n], rule))
+    assert counters == {"timeframe.full": 1, "timeframe.incremental": 4}
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_unchanged_last_bar_is_a_cache_hit(bars, counters, rule):
+    base = bars(400, 2)
+    cache = ResampleCache()
+    frame = cache.resample("X", base, rule)
+    assert cache.resample("X", base.copy(), rule) is frame
+    assert counters.get("timeframe.cache_hit") == 1
+
+    # 当日 K 线还在变: 时间戳相同但数值不同，要重算最后一个周期
+    live = base.copy()
+    live.iloc[-1, live.columns.get_loc("Close")] *= 1.1
+    pd.testing.assert_frame_equal(cache.resample("X", live, rule), resample_ohlc(live, rule))
+    assert counters.get("timeframe.incremental") == 1
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_earlier_as_of_equals_truncated_base(bars, rule):
+    base = bars(700, 3)
+    frame = ResampleCache().resample("X", base, rule)
+    for end in pd.to_datetime(["2015-06-17", "2015-09-01", "2016-02-10", "2016-02-13"]):
+        truncated = base[base.index < end]
+        pd.testing.assert_frame_equal(as_of(frame, base, rule, end), resample_ohlc(truncated, rule))
+
+
+@pytest.mark.parametrize("timeframe", [tf for tf, spec in TIMEFRAMES.items() if spec["base"] == "daily"])
+def test_timeframe_hexagram_uses_no_later_bars(bars, timeframe):
+    base = bars(900, 4)
+    cache = ResampleCache()
+    cache.resample("X", base, TIMEFRAMES[timeframe]["rule"])   # 缓存里已有更晚的数据
+    date = pd.Timestamp("2016-01-20")
+    truncated = base[base.index < date + pd.Timedelta(days=1)]
+    assert timeframe_hexagram(cache, "X", base, timeframe, date) == timeframe_hexagram(ResampleCache(), "Y", truncated, timeframe, date)
+
+
+def test_hourly_window_counts_back_from_last_bar(bars, monkeypatch):
+    # 小时线窗口 = 最后一根往前 40 小时 (连续小时线即 41 根)，不含基准日零点前后多出的部分
+    import hexcore.timeframes as timeframes
+
+    daily = bars(300, 5)
+    index = pd.date_range("2026-01-01", "2026-01-10 15:00", freq="h")
+    base = daily.iloc[:len(index)].set_axis(index)
+    windows = []
+    monkeypatch.setattr(timeframes, "calculate_hexagram", lambda window, multiplier: windows.append(window) or (0, 0, []))
+    _, last = timeframe_hexagram(ResampleCache(), "X", base, "1h", pd.Timestamp("2026-01-10"))
+    assert last == index[-1]
+    assert len(windows[0]) == 41 and windows[0].index[0] == index[-1] - pd.Timedelta(hours=40)